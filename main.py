@@ -1,25 +1,64 @@
 import html
-import json
 import math
 import os
 import re
-import uuid
+import secrets
+import subprocess
+import sys
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode, quote_plus
 
+import orjson
 import pandas as pd
 import psycopg2
+import psycopg2.pool
+import pyarrow as pa
+import pyarrow.compute as pc
 import requests
 import streamlit as st
+import streamlit.components.v1 as components
 from dotenv import load_dotenv
-from google.cloud import translate as translate_client
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
 load_dotenv()
-DB_URL = os.getenv("DATABASE_URL")
+
+
+@lru_cache(maxsize=None)
+def get_config_value(key, default=None):
+    """Read a setting from Streamlit secrets, then the environment; resolved once per process."""
+    try:
+        value = st.secrets.get(key)
+    except Exception:
+        value = None
+    if value in (None, ""):
+        value = os.getenv(key)
+    return default if value in (None, "") else value
+
+
+DB_URL = get_config_value("DATABASE_URL")
+GOOGLE_TRANSLATE_API_KEY = get_config_value("GOOGLE_TRANSLATE_API_KEY")
+DEFAULT_PLACEHOLDER_IMAGE = get_config_value(
+    "DEFAULT_PLACEHOLDER_IMAGE",
+    "https://images.unsplash.com/photo-1568605114967-8130f3a36994?auto=format&fit=crop&w=800&q=60",
+)
+TOKEN_TTL_DAYS = int(get_config_value("TOKEN_TTL_DAYS", 30))
+TOKEN_ROTATE_BUFFER_DAYS = int(get_config_value("TOKEN_ROTATE_BUFFER_DAYS", 5))
+TOKEN_TTL = timedelta(days=TOKEN_TTL_DAYS)
+TOKEN_ROTATE_BUFFER = timedelta(days=TOKEN_ROTATE_BUFFER_DAYS)
 if not DB_URL:
     st.warning("DATABASE_URL is not set. Update your .env or environment variables to enable database access.")
 
 TAG_RE = re.compile(r"<[^>]+>")
+ASSET_PATH_RE = re.compile(r"/asset[-_/]")
+LINE_BREAK_RE = re.compile(r"\s*[\r\n]\s*")
+WHITESPACE_RE = re.compile(r"\s+")
+# Arrow's string kernels use RE2, whose \s is ASCII-only; this matches what Python's \s does.
+ARROW_WHITESPACE_PATTERN = r"[\t-\r\x1c-\x20\x85\p{Z}]+"
+NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]+")
+CSS_PUNCT_RE = re.compile(r"""("[^"]*"|'[^']*')|\s*([{};,>])\s*|:\s+""")
+PHOTO_URL_RE = re.compile(r"https?://[^\s\"'|,<>]+")
 PROPERTY_KEYWORDS = {
     "Townhouse": ["ทาวน์", "townhome", "town house", "townhouse"],
     "Single House": ["บ้านเดี่ยว", "single", "detached"],
@@ -27,13 +66,34 @@ PROPERTY_KEYWORDS = {
     "Commercial": ["อาคารพาณิชย์", "commercial", "office", "อาคาร", "ตึก"],
     "Land": ["ที่ดิน", "land", "plot"],
 }
+PROPERTY_TYPE_LABELS = tuple(PROPERTY_KEYWORDS)
+KEYWORD_TYPE_RANKS = {
+    keyword.lower(): rank
+    for rank, keywords in reversed(list(enumerate(PROPERTY_KEYWORDS.values())))
+    for keyword in keywords
+}
+PROPERTY_TYPE_PATTERNS = {
+    label: "|".join(re.escape(keyword.lower()) for keyword in keywords)
+    for label, keywords in PROPERTY_KEYWORDS.items()
+}
+PROPERTY_TYPE_RE = re.compile(
+    "(?=({}))".format("|".join(
+        re.escape(keyword.lower())
+        for keywords in PROPERTY_KEYWORDS.values()
+        for keyword in sorted(keywords, key=len, reverse=True)
+    ))
+)
+find_property_keywords = PROPERTY_TYPE_RE.findall
 
 class JsonDeckSpec:
     def __init__(self, spec):
         self._spec = spec
+        self._json = None
 
     def to_json(self):
-        return json.dumps(self._spec)
+        if self._json is None:
+            self._json = orjson.dumps(self._spec).decode()
+        return self._json
  
 PHOTO_AVOID_KEYWORDS = [
     "map",
@@ -58,1977 +118,708 @@ PHOTO_FAVOR_KEYWORDS = [
     "interior",
 ]
 
-st.markdown(
-    """
-    <style>
-    .stat-slab {
-        display: flex;
-        gap: 12px;
-    }
-
-    .stat-card {
-        flex: 1;
-        background: rgba(255,255,255,0.9);
-        border-radius: 24px;
-        padding: 16px 18px;
-        border: 1px solid rgba(255,255,255,0.7);
-        text-align: left;
-        box-shadow: 0 16px 30px rgba(15,23,42,0.1);
-    }
-
-    .stat-card label {
-        display: block;
-        font-size: 11px;
-        letter-spacing: 0.2em;
-        text-transform: uppercase;
-        color: rgba(15,23,42,0.55);
-    }
-
-    .stat-card strong {
-        display: block;
-        font-size: 24px;
-        margin-top: 4px;
-        color: #0F172A;
-    }
-
-    .inline-login-card {
-        border-radius: 26px;
-        padding: 16px 18px;
-        background: rgba(255,255,255,0.95);
-        border: 1px solid rgba(15,23,42,0.05);
-        box-shadow: 0 14px 32px rgba(15,23,42,0.08);
-    }
-
-    .inline-login-card h4 {
-        margin: 0 0 2px;
-        font-size: 18px;
-        color: #0F172A;
-    }
-
-    .inline-login-card p {
-        margin: 0 0 16px;
-        font-size: 14px;
-        color: rgba(15,23,42,0.6);
-    }
-
-    .inline-login-card .cta-row {
-        display: flex;
-        gap: 10px;
-    }
-
-    .inline-login-card .cta-row .stButton > button {
-        width: 100%;
-        border-radius: 18px;
-        height: 48px;
-        font-weight: 600;
-        box-shadow: 0 16px 26px rgba(15,23,42,0.12);
-    }
-
-    .inline-login-card .cta-row .stButton > button[data-testid="baseButton-primary"],
-    .inline-login-card .cta-row .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, #1AAE80, #26C589);
-        color: #fff;
-        border: none;
-    }
-
-    .recommend-title {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        margin: 34px 0 12px;
-    }
-
-    .recommend-title h3 {
-        margin: 0;
-        font-size: 22px;
-    }
-
-    .recommend-cards {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-        gap: 18px;
-    }
-
-    .recommend-card {
-        border-radius: 32px;
-        padding: 16px;
-        background: #fff;
-        border: 1px solid rgba(15,23,42,0.05);
-        box-shadow: 0 18px 36px rgba(15,23,42,0.12);
-        display: flex;
-        flex-direction: column;
-        gap: 14px;
-        text-decoration: none;
-        color: #0F172A;
-    }
-
-    .recommend-media {
-        position: relative;
-        border-radius: 26px;
-        overflow: hidden;
-    }
-
-    .recommend-media img {
-        width: 100%;
-        height: 190px;
-        object-fit: cover;
-        display: block;
-    }
-
-    .card-badge {
-        position: absolute;
-        top: 14px;
-        left: 14px;
-        padding: 6px 14px;
-        border-radius: 999px;
-        background: rgba(255,255,255,0.9);
-        font-size: 13px;
-        font-weight: 600;
-        color: #0F172A;
-        box-shadow: 0 10px 18px rgba(15,23,42,0.12);
-    }
-
-    .recommend-heart {
-        position: absolute;
-        top: 14px;
-        right: 14px;
-        width: 44px;
-        height: 44px;
-        border-radius: 50%;
-        background: rgba(255,255,255,0.95);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 20px;
-        color: #d946ef;
-        box-shadow: 0 12px 24px rgba(15,23,42,0.18);
-    }
-
-    .recommend-heart.saved {
-        background: linear-gradient(135deg, #EC4899, #F97316);
-        color: #fff;
-    }
+PHOTO_AVOID_RE = re.compile("|".join(map(re.escape, PHOTO_AVOID_KEYWORDS)))
+PHOTO_FAVOR_RE = re.compile("|".join([*map(re.escape, PHOTO_FAVOR_KEYWORDS), ASSET_PATH_RE.pattern]))
 
-    .recommend-body {
-        display: flex;
-        flex-direction: column;
-        gap: 10px;
-    }
 
-    .card-headline {
-        display: flex;
-        justify-content: space-between;
-        gap: 12px;
-        align-items: center;
-    }
+def minify_css_token(match):
+    """Keep quoted strings intact; drop the spaces around CSS punctuation."""
+    return match.group(1) or match.group(2) or ":"
 
-    .card-headline h4 {
-        margin: 0;
-        font-size: 20px;
-    }
 
-    .card-headline p {
-        margin: 0;
-        color: rgba(15,23,42,0.55);
-        font-size: 14px;
-    }
+@st.cache_resource(show_spinner=False)
+def load_app_css():
+    """Read styles.css once and minify it to a single line for st.markdown."""
+    with open(os.path.join(APP_DIR, "styles.css"), encoding="utf-8") as fh:
+        css = WHITESPACE_RE.sub(" ", fh.read()).strip()
+    return f"<style>{CSS_PUNCT_RE.sub(minify_css_token, css)}</style>"
 
-    .rec-price {
-        font-size: 20px;
-        color: #0F172A;
-        white-space: nowrap;
-    }
 
-    .card-meta-row {
-        display: flex;
-        flex-wrap: wrap;
-        gap: 8px;
-    }
+st.markdown(load_app_css(), unsafe_allow_html=True)
 
-    .meta-pill {
-        border-radius: 999px;
-        background: rgba(15,23,42,0.05);
-        padding: 6px 12px;
-        font-size: 13px;
-        color: rgba(15,23,42,0.75);
-        display: inline-flex;
-        align-items: center;
-        gap: 4px;
-    }
+# --- DB HELPER ---
 
-    .meta-pill .meta-icon {
-        width: 18px;
-        height: 18px;
-        display: inline-flex;
-        align-items: center;
-        justify-content: center;
-    }
+@st.cache_resource(show_spinner=False)
+def get_db_pool():
+    """One connection pool per server process, shared by every session."""
+    return psycopg2.pool.ThreadedConnectionPool(minconn=1, maxconn=20, dsn=DB_URL)
 
-    .bottom-nav {
-        margin-top: 28px;
-        padding: 12px 18px;
-        border-radius: 28px;
-        background: rgba(255,255,255,0.95);
-        border: 1px solid rgba(15,23,42,0.06);
-        box-shadow: 0 18px 36px rgba(15,23,42,0.12);
-    }
 
-    .bottom-nav-grid {
-        display: grid;
-        grid-template-columns: repeat(4, 1fr);
-        gap: 4px;
-    }
+def run_query_rows(query, params=()):
+    """Run a statement on a pooled connection; SELECTs return (column_names, rows) without building a DataFrame."""
+    try:
+        pool = get_db_pool()
+    except Exception as e:
+        st.error(f"Database Query Failed: {e}")
+        return None
+    for attempt in range(2):
+        try:
+            conn = pool.getconn()
+        except Exception as e:
+            st.error(f"Database Query Failed: {e}")
+            return None
+        discard = False
+        try:
+            # Every statement stands alone, so skip the explicit COMMIT round-trip.
+            if not conn.autocommit:
+                conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                if query.strip().upper().startswith("SELECT"):
+                    col_names = [desc[0] for desc in cur.description]
+                    return col_names, cur.fetchall()
+                return None
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            # Idle pooled connections can be dropped by the server; throw this one away and retry once on a fresh one.
+            discard = True
+            if attempt == 0:
+                continue
+            st.error(f"Database Query Failed: {e}")
+            return None
+        except Exception as e:
+            if not conn.closed:
+                conn.rollback()
+            st.error(f"Database Query Failed: {e}")
+            return None
+        finally:
+            pool.putconn(conn, close=discard or bool(conn.closed))
 
-    .bottom-nav-grid .stButton > button {
-        width: 100%;
-        border-radius: 18px;
-        padding: 12px 0 8px;
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-        justify-content: center;
-        gap: 4px;
-        background: transparent;
-        border: none;
-        color: rgba(15,23,42,0.6);
-        font-weight: 600;
-    }
 
-    .bottom-nav-grid .stButton > button[data-testid="baseButton-primary"],
-    .bottom-nav-grid .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, #0F172A, #1F2650);
-        color: #fff;
-    }
-        --surface-alt: #F7FCFA;
-        --panel: #FFFFFF;
-        --border: #D9E8E1;
-        --border-strong: #A4D5BF;
-        --text: #0F172A;
-        --text-muted: #6B7280;
-        --eyebrow: #94A3B8;
-        --primary: #1AA7EC;
-        --accent: #2FB47C;
-        --accent-strong: #1E9C66;
-        --danger: #F87171;
-        --shadow-soft: 0 18px 40px rgba(31, 102, 91, 0.16);
-    }
+def run_query(query, params=()):
+    result = run_query_rows(query, params)
+    if result is None:
+        return None
+    col_names, data = result
+    return pd.DataFrame(data, columns=col_names)
 
-    body {
-        background: radial-gradient(circle at 10% 10%, rgba(46,196,182,0.18), transparent 45%),
-                    radial-gradient(circle at 80% 0%, rgba(16,185,129,0.18), transparent 35%),
-                    linear-gradient(180deg, #F7FCFA, #ECF5F1 65%, #E7F3EF);
-        color: var(--text);
-        font-family: 'Inter', 'SF Pro Display', 'Noto Sans Thai', sans-serif;
-    }
 
-    ::selection {
-        background: rgba(34, 197, 94, 0.35);
-        color: #050505;
-    }
+PROPERTY_COLUMNS = (
+    'id', 'title', 'title_en', 'price', 'size_sqm', 'usable_area', 'area_sqm',
+    'land_size', 'land_size_sqm', 'land_size_sq_wah', 'land_size_rai', 'lat', 'lon', 'url', 'photos',
+    'property_type', 'sale_channel', 'description', 'description_en', 'location', 'location_en',
+    'contact', 'contact_en', 'bank', 'bank_en', 'rent_estimate', 'investment_rating', 'total_rating',
+    'rooms', 'bedrooms', 'bathrooms', 'bath_count', 'last_updated',
+)
 
-    .property-card *::selection {
-        background: rgba(34, 197, 94, 0.45);
-        color: #050505;
-    }
 
-    section.main .block-container {
-        max-width: 1320px;
-        padding: 0 12px 40px;
-    }
+def property_select_list():
+    """Columns the UI reads that exist in this database; falls back to * if the catalog can't be read."""
+    result = run_query_rows(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = 'properties'"
+    )
+    available = {row[0] for row in result[1]} if result else set()
+    selected = [column for column in PROPERTY_COLUMNS if column in available]
+    return ", ".join(selected) if 'id' in selected else "*"
 
-    .top-nav {
-        display: flex;
-        justify-content: space-between;
-        align-items: flex-start;
-        border: 1px solid rgba(255,255,255,0.6);
-        background: linear-gradient(140deg, rgba(47,180,124,0.18), rgba(26,167,236,0.18));
-        border-radius: 26px;
-        padding: 18px;
-        flex-wrap: wrap;
-        gap: 16px;
-        box-shadow: var(--shadow-soft);
-        position: sticky;
-        top: 0;
-        z-index: 10;
-        backdrop-filter: blur(8px);
-    }
 
-    .brand-lockup {
-        display: flex;
-        flex-direction: column;
-        gap: 4px;
-    }
+class ListingsUnavailable(Exception):
+    """Raised when the listings query fails, so the failure is not cached."""
 
-    .brand-lockup .eyebrow {
-        text-transform: uppercase;
-        letter-spacing: 0.16em;
-        font-size: 11px;
-        color: var(--eyebrow);
-    }
 
-    .brand-lockup h1 {
-        margin: 0;
-        font-size: 28px;
-        color: var(--text);
-    }
+@st.cache_data(ttl=600, show_spinner=False)
+def load_properties_df():
+    """Cached wrapper to keep the UI responsive between reruns."""
+    df = run_query(f"SELECT {property_select_list()} FROM properties")
+    if df is None:
+        raise ListingsUnavailable("properties query failed")
+    return attach_display_columns(attach_photo_columns(coerce_listing_dtypes(df)))
 
-    .brand-lockup span {
-        color: var(--text-muted);
-        font-size: 14px;
-    }
 
-    .nav-actions {
-        display: flex;
-        gap: 12px;
-        align-items: center;
-        flex-wrap: wrap;
-    }
+# NUMERIC columns arrive as Decimal objects; everything that reads them goes through float() anyway.
+MEASURE_COLUMNS = (
+    'size_sqm', 'usable_area', 'area_sqm', 'land_size', 'land_size_sqm', 'land_size_sq_wah', 'land_size_rai',
+    'rooms', 'bedrooms', 'bathrooms', 'bath_count',
+)
 
-    .hero-shell {
-        margin-top: 20px;
-        border-radius: 44px;
-        background: linear-gradient(145deg, #EEF2FF, #E6FBF4);
-        padding: 30px 32px 32px;
-        box-shadow: 0 36px 70px rgba(15,23,42,0.16);
-        display: flex;
-        flex-direction: column;
-        gap: 18px;
-        position: relative;
-    }
 
-    .hero-shell::after {
-        content: "";
-        position: absolute;
-        inset: 10px;
-        border-radius: 38px;
-        border: 1px solid rgba(255,255,255,0.65);
-        pointer-events: none;
-    }
+def coerce_listing_dtypes(df):
+    if df is None or df.empty:
+        return df
+    for column in ('price', 'lat', 'lon', *MEASURE_COLUMNS):
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    if 'sale_channel' in df.columns:
+        df['sale_channel'] = df['sale_channel'].fillna('standard').astype('category')
+    return df
 
-    .hero-topline {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        gap: 16px;
-    }
 
-    .hero-location-chip {
-        display: flex;
-        align-items: center;
-        gap: 12px;
-        padding: 10px 18px;
-        border-radius: 999px;
-        background: rgba(255,255,255,0.92);
-        border: 1px solid rgba(15,23,42,0.05);
-        box-shadow: 0 12px 24px rgba(15,23,42,0.08);
-    }
+SEARCH_FIELDS = ('title', 'location', 'description', 'bank', 'contact')
 
-    .hero-location-icon {
-        width: 38px;
-        height: 38px;
-        border-radius: 50%;
-        background: linear-gradient(135deg, #8A7BFF, #6AD7FF);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 18px;
-        color: #fff;
-        box-shadow: 0 10px 18px rgba(106,215,255,0.35);
-    }
 
-    .hero-location-chip label {
-        display: block;
-        font-size: 11px;
-        letter-spacing: 0.2em;
-        text-transform: uppercase;
-        color: rgba(15,23,42,0.5);
-    }
+def listing_search_text(df):
+    """One Arrow string per listing joining every SEARCH_FIELDS column, so a keyword is matched in one pass."""
+    parts = []
+    for field in SEARCH_FIELDS:
+        if field not in df.columns:
+            continue
+        try:
+            values = pa.array(df[field], type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            values = pa.array(df[field].astype(str), type=pa.string())
+        parts.append(pc.fill_null(values, ""))
+    if not parts:
+        return pa.nulls(len(df), type=pa.string())
+    # The unit separator keeps a keyword from matching across two fields.
+    return pc.binary_join_element_wise(*parts, "\x1f")
 
-    .hero-location-chip strong {
-        display: block;
-        font-size: 18px;
-        color: #0F172A;
-    }
 
-    .hero-alert-bubble {
-        width: 48px;
-        height: 48px;
-        border-radius: 24px;
-        background: rgba(255,255,255,0.95);
-        border: 1px solid rgba(15,23,42,0.08);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 20px;
-        box-shadow: 0 14px 28px rgba(15,23,42,0.16);
-    }
+def keyword_mask(search_text, keyword):
+    hits = pc.match_substring(search_text, keyword, ignore_case=True)
+    return pc.fill_null(hits, False).to_numpy(zero_copy_only=False)
 
-    .hero-heading h1 {
-        margin: 8px 0 4px;
-        font-size: clamp(32px, 5vw, 42px);
-        line-height: 1.1;
-        color: #0F172A;
-    }
 
-    .hero-heading p {
-        margin: 0;
-        font-size: 16px;
-        color: rgba(15,23,42,0.6);
-    }
+CARD_COLUMNS = (
+    'id', 'property_id', 'title', 'title_en', 'location', 'location_en', 'bank', 'bank_en',
+    'contact', 'contact_en', 'price', 'property_type', 'sale_channel', 'size_sqm', 'usable_area',
+    'area_sqm', 'bedrooms', 'rooms', 'bathrooms', 'bath_count', 'photos', 'photos_list', 'first_photo',
+    'price_display', 'size_display',
+)
 
-    .hero-eyebrow-small {
-        font-size: 12px;
-        letter-spacing: 0.32em;
-        text-transform: uppercase;
-        color: rgba(15,23,42,0.55);
-    }
 
-    .hero-search-group {
-        display: grid;
-        grid-template-columns: minmax(0, 1fr) 60px 60px;
-        gap: 12px;
-        align-items: center;
-    }
+def sanitize_rich_text(value):
+    if value is None:
+        return ""
+    return sanitize_text(str(value))
 
-    .search-pill-shell {
-        border-radius: 999px;
-        background: rgba(255,255,255,0.95);
-        padding: 10px 20px 10px 54px;
-        min-height: 64px;
-        display: flex;
-        align-items: center;
-        position: relative;
-        box-shadow: inset 0 1px 0 rgba(255,255,255,0.9);
-    }
 
-    .search-pill-shell::before {
-        content: "";
-        position: absolute;
-        left: 22px;
-        width: 22px;
-        height: 22px;
-        background: url('data:image/svg+xml,%3Csvg xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="%230F172A"%3E%3Cpath stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="m21 21-4.35-4.35M10 18a8 8 0 1 0 0-16 8 8 0 0 0 0 16z"/%3E%3C/svg%3E') center/contain no-repeat;
-        opacity: 0.45;
-    }
+@lru_cache(maxsize=4096)
+def sanitize_text(text):
+    if "&" in text:
+        text = html.unescape(text)
+    if "<" in text:
+        text = TAG_RE.sub(" ", text)
+    text = WHITESPACE_RE.sub(" ", text)
+    return text.strip()
 
-    .search-pill-shell div[data-baseweb="input"] {
-        border: none;
-        background: transparent;
-        box-shadow: none;
-    }
 
-    .search-pill-shell input {
-        border: none !important;
-        background: transparent !important;
-        font-size: 18px;
-        font-weight: 600;
-        color: #0F172A;
-        padding: 0;
-    }
+def clean_text_field(value, default=""):
+    cleaned = sanitize_rich_text(value)
+    return cleaned if cleaned else default
 
-    .round-icon-button .stButton > button {
-        width: 100%;
-        height: 64px;
-        border-radius: 999px;
-        border: none;
-        background: rgba(255,255,255,0.92);
-        font-size: 16px;
-        font-weight: 600;
-        box-shadow: 0 12px 28px rgba(15,23,42,0.12);
-        color: #0F172A;
-    }
 
-    .chip-toolbar .chip-button.voice .stButton > button {
-        background: linear-gradient(135deg, #0F172A, #1F2650);
-        color: #fff;
-        border: none;
-        box-shadow: 0 18px 30px rgba(15,23,42,0.25);
-    }
+MISSING_TEXT_VALUES = frozenset({'n/a', 'na', '-', '—'})
 
-    .category-pills {
-        display: flex;
-        gap: 12px;
-        flex-wrap: nowrap;
-        overflow-x: auto;
-        padding-bottom: 6px;
-        scroll-snap-type: x proximity;
-    }
 
-    .category-pills::-webkit-scrollbar {
-        height: 0px;
-    }
+def is_missing_text(value):
+    return not value or value.casefold() in MISSING_TEXT_VALUES
 
-    .category-pills .stButton > button {
-        border-radius: 999px;
-        border: 1px solid rgba(15,23,42,0.08);
-        background: rgba(255,255,255,0.88);
-        padding: 12px 20px 12px 64px;
-        font-weight: 600;
-        color: #0F172A;
-        box-shadow: 0 12px 24px rgba(15,23,42,0.1);
-        scroll-snap-align: start;
-        position: relative;
-        text-align: left;
-    }
 
-    .category-pills .stButton > button[data-testid="baseButton-primary"],
-    .category-pills .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, #8A7BFF, #6AD7FF);
-        color: #fff;
-        border: none;
-        box-shadow: 0 16px 30px rgba(109,141,255,0.35);
-    }
+def clean_text_series(series):
+    text = series.astype('string[pyarrow]')
+    has_entity = text.str.contains('&', regex=False, na=False)
+    if has_entity.any():
+        text = text.where(~has_entity, text[has_entity].map(html.unescape))
+    if text.str.contains('<', regex=False, na=False).any():
+        text = text.str.replace(TAG_RE.pattern, ' ', regex=True)
+    text = text.str.replace(ARROW_WHITESPACE_PATTERN, ' ', regex=True).str.strip()
+    return text.fillna('').astype(object)
 
-    .category-pills .stButton > button::before {
-        content: "";
-        position: absolute;
-        left: 16px;
-        top: 50%;
-        transform: translateY(-50%);
-        width: 36px;
-        height: 36px;
-        border-radius: 50%;
-        background: linear-gradient(135deg, #e0e7ff, #c7d2fe);
-        box-shadow: inset 0 0 0 2px rgba(255,255,255,0.8), 0 10px 18px rgba(15,23,42,0.12);
-        background-size: cover;
-        background-position: center;
-    }
 
-    .category-pills .stButton:nth-child(1) > button::before {
-        background-image: url('https://images.unsplash.com/photo-1505692794400-4d1b9f38cafb?auto=format&fit=crop&w=200&q=60');
-    }
+def first_text_column(df, columns, default):
+    result = pd.Series(default, index=df.index, dtype=object)
+    for column in reversed(columns):
+        if column in df.columns:
+            cleaned = clean_text_series(df[column])
+            result = cleaned.where(cleaned != "", result)
+    return result
 
-    .category-pills .stButton:nth-child(2) > button::before {
-        background-image: url('https://images.unsplash.com/photo-1568605114967-8130f3a36994?auto=format&fit=crop&w=200&q=60');
-    }
 
-    .category-pills .stButton:nth-child(3) > button::before {
-        background-image: url('https://images.unsplash.com/photo-1512918728675-ed5a9ecdebfd?auto=format&fit=crop&w=200&q=60');
-    }
+@lru_cache(maxsize=2048)
+def compact_html(html_str):
+    if not html_str:
+        return ""
+    return LINE_BREAK_RE.sub("", str(html_str)).strip()
 
-    .category-pills .stButton:nth-child(4) > button::before {
-        background-image: url('https://images.unsplash.com/photo-1464146072230-91cabc968266?auto=format&fit=crop&w=200&q=60');
-    }
 
-    .category-pills .stButton:nth-child(5) > button::before {
-        background-image: url('https://images.unsplash.com/photo-1479839672679-a46483c0e7c8?auto=format&fit=crop&w=200&q=60');
-    }
+HERO_HEADING_TEMPLATE = compact_html(
+    """
+    <div class='hero-topline'>
+        <div class='hero-location-chip'>
+            <div class='hero-location-icon'>📍</div>
+            <div>
+                <label>Focus area</label>
+                <strong>{focus_location}</strong>
+            </div>
+        </div>
+        <div class='hero-alert-bubble'>🔔</div>
+    </div>
+    <div class='hero-heading'>
+        <div class='hero-eyebrow-small'>{greeting}</div>
+        <h1>Search your house by Jesp</h1>
+        <p>Hand-picked deals for {hero_name} across {focus_location}.</p>
+    </div>
+    """
+)
 
-    .control-bar {
-        display: flex;
-        gap: 12px;
-        flex-wrap: wrap;
-        margin-top: 6px;
+HERO_CATEGORIES = [
+    {"label": "House", "icon": "🏠", "aliases": ["Single House", "House", "Townhouse", "Townhome"]},
+    {"label": "Villa", "icon": "🏡", "aliases": ["Villa", "Single House", "House"]},
+    {"label": "Apart.", "icon": "🏢", "aliases": ["Condo", "Apartment"]},
+    {"label": "Hotel", "icon": "🏨", "aliases": ["Hotel", "Commercial"]},
+]
+# Earlier categories win when an alias (e.g. "Single House") appears in more than one.
+HERO_CATEGORY_BY_ALIAS = {alias: cat['label'] for cat in reversed(HERO_CATEGORIES) for alias in cat['aliases']}
+
+# UI labels
+UI_LABELS = {
+    "English": {
+        "market": "Market Opportunities",
+        "min_price": "Min Price (THB)",
+        "max_price": "Max Price (THB)",
+        "property_type": "Property Type",
+        "rooms": "Rooms",
+        "bathrooms": "Bathrooms",
+        "listings_found": "Listings Found",
+        "page": "Page",
+        "price": "Price",
+        "location": "Location",
+        "description": "Description",
+        "contact": "Contact",
+        "living_rating": "Living Condition Rating",
+        "rent_estimate": "Rent Estimate",
+        "investment_rating": "Investment Rating",
+        "bank": "Bank",
+        "beds": "Bedrooms",
+        "baths": "Bathrooms",
+        "land_size": "Land Size",
+        "size_label": "Living Area"
+    },
+    "ไทย": {
+        "market": "โอกาสในตลาด",
+        "min_price": "ราคาขั้นต่ำ (บาท)",
+        "max_price": "ราคาสูงสุด (บาท)",
+        "property_type": "ประเภทอสังหาริมทรัพย์",
+        "rooms": "จำนวนห้อง",
+        "bathrooms": "จำนวนห้องน้ำ",
+        "listings_found": "รายการที่พบ",
+        "page": "หน้า",
+        "price": "ราคา",
+        "location": "ที่ตั้ง",
+        "description": "รายละเอียด",
+        "contact": "ติดต่อ",
+        "living_rating": "คะแนนสภาพความเป็นอยู่",
+        "rent_estimate": "ประมาณค่าเช่า",
+        "investment_rating": "คะแนนการลงทุน",
+        "bank": "ธนาคาร",
+        "beds": "ห้องนอน",
+        "baths": "ห้องน้ำ",
+        "land_size": "พื้นที่ที่ดิน",
+        "size_label": "พื้นที่ใช้สอย"
     }
+}
 
-    .control-bar > div {
-        flex: 1 1 200px;
-        border-radius: 18px;
-        border: 1px solid rgba(15,23,42,0.08);
-        background: #fff;
-        padding: 10px 14px;
-        box-shadow: 0 10px 24px rgba(15,23,42,0.08);
-    }
+RECOMMEND_CARD_TEMPLATE = compact_html(
+    """
+    <a class='recommend-card' href='{card_href}'>
+        <div class='recommend-media'>
+            <img src='{photo_url}' alt='{title}' loading='lazy'/>
+            <span class='card-badge'>{badge_text}</span>
+            <span class='{heart_class}'>{heart_symbol}</span>
+        </div>
+        <div class='recommend-body'>
+            <div class='card-headline'>
+                <div>
+                    <p>{location}</p>
+                    <h4>{title}</h4>
+                </div>
+                <strong class='rec-price'>{price}</strong>
+            </div>
+            <div class='card-meta-row'>
+                {meta_html}
+            </div>
+        </div>
+    </a>
+    """
+)
 
-    .control-bar .nav-chip,
-    .control-bar .heart-control button {
-        width: 100%;
-    }
+PROPERTY_CARD_TEMPLATE = compact_html(
+    """
+    <div class="property-card">
+        <a class='card-photo' href='{photo_href}' onclick="event.stopPropagation();" target='_self'>
+            <img src='{photo_url}' alt='Photo of {title}' loading='lazy'/>
+            <div class='photo-top-row'>
+                <span class='photo-pill'>{property_type}</span>
+                <div class='photo-actions'>
+                    {save_html}
+                    {share_html}
+                </div>
+            </div>
+            <div class='photo-bottom-row'>
+                <span class='photo-pill'>{photo_count_label}</span>
+                <div class='photo-actions'>
+                    {sale_html}
+                </div>
+            </div>
+        </a>
+        <div class="card-body" role="link" tabindex="0" onclick="window.location='{detail_href}'" onkeypress="if(event.key==='Enter' || event.key===' '){{window.location='{detail_href}'}}">
+            <h4>{title}</h4>
+            <p class='card-location'>📍 {location}</p>
+            {specs_html}
+            <div class='agent-chip'>
+                <div class='agent-avatar'>👤</div>
+                <div>
+                    <strong>{agent_name}</strong>
+                    <span>{agent_meta}</span>
+                </div>
+            </div>
+            <div class='price-cta-row'>
+                <div class='price-stack'>
+                    <span>{price_label}</span>
+                    <strong>{price}</strong>
+                </div>
+                <a class='buy-pill' href='{detail_href}' onclick="event.stopPropagation();">Buy Now</a>
+            </div>
+        </div>
+    </div>
+    """
+)
 
-    .nav-chip,
-    .heart-control button,
-    .pill-link,
-    .cta-heart {
-        border-radius: 999px;
-        border: 1px solid var(--border);
-        background: #fff;
-        color: var(--text);
-        font-size: 13px;
-        padding: 8px 18px;
-        font-weight: 600;
-        box-shadow: 0 12px 28px rgba(15,23,42,0.08);
-    }
+DETAIL_BODY_TEMPLATE = compact_html(
+    """
+    <div class='detail-body'>
+        <h4>Full details</h4>
+        {overview_html}
+        <div class='detail-duo'>
+            <div><span>{contact_label}:</span>{contact_html}</div>
+            <div><span>{bank_label}:</span><p>{bank}</p></div>
+        </div>
+        <div class='detail-duo'>
+            <div><span>{rent_label}:</span><p>{rent}</p></div>
+            <div><span>{rating_label}:</span><p>{rating}/10</p></div>
+        </div>
+        <div class='detail-links'>
+            {detail_links_html}
+        </div>
+    </div>
+    """
+)
 
-    .heart-control {
-        min-width: 120px;
-    }
+DETAIL_HERO_TEMPLATE = compact_html(
+    """
+    <div class='detail-page-shell'>
+        <div class='detail-hero'>
+            <img src='{photo_url}' alt='detail hero' loading='lazy'/>
+            <div class='detail-hero-overlay'>
+                <div>
+                    <div class='modal-pill'>{property_type}</div>
+                    <h2>{title}</h2>
+                    <p>{location}</p>
+                    <div class='sale-pill'>{sale_label}{bank_line}</div>
+                </div>
+                <div class='detail-hero-actions'>
+                    {hero_cta_html}
+                </div>
+            </div>
+        </div>
+    </div>
+    """
+)
 
-    .heart-control.saved-active button,
-    .cta-heart.saved {
-        background: var(--accent);
-        border-color: var(--accent);
-        color: #f0fdf4;
-        box-shadow: 0 14px 30px rgba(31,173,116,0.35);
-    }
+MAP_ACTION_ROW_TEMPLATE = compact_html(
+    """
+    <div class='map-action-row'>
+        <span class='map-action-label'>Directions</span>
+        {action_buttons}
+    </div>
+    """
+)
 
-    .metric-row {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-        gap: 18px;
-        margin: 20px 0;
-    }
+LOCATION_CARD_TEMPLATE = compact_html(
+    """
+    <div class='detail-location-card'>
+        <div class='location-line'>
+            <span class='location-pill'>{location}</span>
+            {original_note}
+        </div>
+        {direction_actions}
+    </div>
+    """
+)
 
-    .metric-pill {
-        padding: 20px;
-        background: var(--panel);
-        border-radius: 26px;
-        border: 1px solid rgba(255,255,255,0.9);
-        box-shadow: var(--shadow-soft);
-    }
 
-    .metric-pill h3 {
-        margin: 6px 0 0;
-        font-size: 32px;
-        color: var(--text);
-    }
+def rank_photos(urls):
+    """Dedupe candidate URLs and sort them by penalty, scanning each URL once; returns (url, is_property, is_map) tuples."""
+    ranked = []
+    seen = set()
+    for url in urls:
+        if not url:
+            continue
+        url = url.strip()
+        lowered = url.lower()
+        if not lowered.startswith("http") or url in seen:
+            continue
+        seen.add(url)
+        is_map = PHOTO_AVOID_RE.search(lowered) is not None
+        is_property = PHOTO_FAVOR_RE.search(lowered) is not None
+        penalty = len(ranked) + (200 if is_map else 0) - (50 if is_property else 0)
+        ranked.append((penalty, url, is_property, is_map))
+    ranked.sort(key=lambda entry: entry[0])
+    return [entry[1:] for entry in ranked]
 
-    .metric-pill span {
-        color: var(--eyebrow);
-        font-size: 12px;
-        text-transform: uppercase;
-        letter-spacing: 0.16em;
-    }
 
-    .filter-card {
-        padding: 24px;
-        background: var(--panel);
-        border-radius: 28px;
-        border: 1px solid rgba(255,255,255,0.9);
-        margin-bottom: 22px;
-        box-shadow: var(--shadow-soft);
-    }
+GOOGLE_MAPS_URL = "https://www.google.com/maps/search/?api=1&query={}"
+APPLE_MAPS_URL = "https://maps.apple.com/?q={}"
 
-    .active-keyword-pill {
-        display: inline-flex;
-        justify-content: flex-end;
-        width: 100%;
-        padding: 10px 16px;
-        border-radius: 999px;
-        border: 1px dashed var(--border-strong);
-        background: var(--surface-alt);
-        font-size: 12px;
-        letter-spacing: 0.12em;
-        text-transform: uppercase;
-        color: var(--eyebrow);
-        gap: 6px;
-    }
 
-    .active-keyword-pill .pill-icon {
-        font-size: 14px;
-    }
+@lru_cache(maxsize=4096)
+def map_link_urls(query):
+    """Google and Apple Maps URLs for a query, encoded and formatted once per distinct query."""
+    encoded = quote_plus(query)
+    return GOOGLE_MAPS_URL.format(encoded), APPLE_MAPS_URL.format(encoded)
 
-    .filter-card [data-baseweb="slider"] {
-        display: none !important;
-    }
 
-    .filter-card label {
-        color: var(--eyebrow);
-        font-size: 11px;
-        text-transform: uppercase;
-        letter-spacing: 0.18em;
-    }
+def build_map_links(lat, lon, fallback_location):
+    query = None
+    try:
+        if lat is not None and lon is not None:
+            lat_val = float(lat)
+            lon_val = float(lon)
+            if not (math.isnan(lat_val) or math.isnan(lon_val)):
+                query = f"{lat_val:.6f},{lon_val:.6f}"
+    except (TypeError, ValueError):
+        query = None
 
-    .property-grid-row div[data-testid="stHorizontalBlock"] {
-        display: flex;
-        flex-direction: column;
-        gap: 20px !important;
-    }
+    if not query:
+        cleaned = clean_text_field(fallback_location)
+        if cleaned:
+            query = cleaned
 
-    .property-grid-row div[data-testid="column"] {
-        flex: 1 1 100%;
-        min-width: 0;
-        display: flex;
-    }
+    if not query:
+        return {}
 
-    .property-grid-row div[data-testid="column"] > div {
-        width: 100%;
-        display: flex;
-    }
+    google_url, apple_url = map_link_urls(query)
+    return {"google": google_url, "apple": apple_url}
 
-    .property-card {
-        border-radius: 32px;
-        background: #ffffff;
-        padding: 18px;
-        box-shadow: 0 20px 40px rgba(15, 23, 42, 0.12);
-        display: flex;
-        flex-direction: column;
-        gap: 16px;
-    }
 
-    .card-photo {
-        position: relative;
-        display: block;
-        border-radius: 28px;
-        overflow: hidden;
-        box-shadow: inset 0 0 0 1px rgba(255,255,255,0.6);
-    }
+@lru_cache(maxsize=512)
+def build_pagination_sequence(current_page, total_pages, window=1):
+    """Page labels for the pager; a tuple so the cached value cannot be mutated."""
+    if total_pages <= 7:
+        return tuple(range(1, total_pages + 1))
+    left = max(2, current_page - window)
+    right = min(total_pages - 1, current_page + window)
+    head = (1, '...') if left > 2 else (1,)
+    tail = ('...', total_pages) if right < total_pages - 1 else (total_pages,)
+    return head + tuple(range(left, right + 1)) + tail
 
-    .card-photo img {
-        width: 100%;
-        height: 220px;
-        object-fit: cover;
-        display: block;
-        transition: transform 0.25s ease;
-    }
 
-    .card-photo:hover img {
-        transform: scale(1.03);
-    }
+@lru_cache(maxsize=256)
+def pagination_options(current_page, total_pages):
+    """Pager options; each '...' gap gets its own negative placeholder so the options stay unique."""
+    options = []
+    for label in build_pagination_sequence(current_page, total_pages):
+        options.append(-len(options) - 1 if label == '...' else label)
+    return tuple(options)
 
-    .photo-top-row,
-    .photo-bottom-row {
-        position: absolute;
-        left: 14px;
-        right: 14px;
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-    }
 
-    .photo-top-row { top: 14px; }
-    .photo-bottom-row { bottom: 14px; }
-
-    .photo-pill {
-        padding: 6px 14px;
-        border-radius: 999px;
-        background: rgba(255,255,255,0.92);
-        font-size: 11px;
-        letter-spacing: 0.16em;
-        text-transform: uppercase;
-        color: var(--accent-strong);
-        font-weight: 600;
-    }
+def pagination_label(option):
+    return str(option) if option > 0 else "..."
 
-    .photo-actions {
-        display: flex;
-        gap: 8px;
-    }
 
-    .icon-btn {
-        width: 38px;
-        height: 38px;
-        border-radius: 14px;
-        border: none;
-        background: rgba(255,255,255,0.9);
-        box-shadow: 0 10px 24px rgba(15,23,42,0.18);
-        display: inline-flex;
-        align-items: center;
-        justify-content: center;
-    }
+def photo_candidates(photo_text):
+    """Every URL in a photos field, in order: bare comma/pipe lists and src="..." markup alike."""
+    return PHOTO_URL_RE.findall(photo_text)
 
-    .icon-btn::before {
-        content: "";
-        width: 18px;
-        height: 18px;
-        display: block;
-        background-size: contain;
-        background-repeat: no-repeat;
-    }
 
-    .icon-btn.share::before {
-        background-image: url('data:image/svg+xml,%3Csvg xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="%230F172A"%3E%3Cpath stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M17 8.517a3 3 0 1 0-2-5.517 3 3 0 0 0 2 5.517zM7 14.517a3 3 0 1 0-2 5.517 3 3 0 0 0 2-5.517z"/%3E%3Cpath stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="m7.5 13.5 9-5"/%3E%3Cpath stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="m7.5 10.5 9 5"/%3E%3C/svg%3E');
-    }
+def extract_primary_photo(photo_field):
+    if not photo_field:
+        return DEFAULT_PLACEHOLDER_IMAGE
+    ranked = rank_photos(photo_candidates(str(photo_field)))
+    if not ranked:
+        return DEFAULT_PLACEHOLDER_IMAGE
+    for url, is_property, _ in ranked:
+        if is_property:
+            return url
+    for url, _, is_map in ranked:
+        if not is_map:
+            return url
+    return ranked[0][0]
 
-    .icon-btn.heart::before {
-        background-image: url('data:image/svg+xml,%3Csvg xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="%23ec4899"%3E%3Cpath stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4.318 6.318a4.5 4.5 0 0 1 6.364 0L12 7.636l1.318-1.318a4.5 4.5 0 1 1 6.364 6.364L12 21.364l-7.682-7.682a4.5 4.5 0 0 1 0-6.364z"/%3E%3C/svg%3E');
-    }
 
-    .icon-btn.heart.saved {
-        background: #ec4899;
-    }
+def extract_all_photos(photo_field):
+    if not photo_field:
+        return [DEFAULT_PLACEHOLDER_IMAGE]
+    ranked = rank_photos(photo_candidates(str(photo_field)))
+    if not ranked:
+        return [DEFAULT_PLACEHOLDER_IMAGE]
+    property_first = [url for url, is_property, _ in ranked if is_property]
+    return property_first + [url for url, is_property, _ in ranked if not is_property]
 
-    .icon-btn.heart.saved::before {
-        background-image: url('data:image/svg+xml,%3Csvg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="white"%3E%3Cpath d="M12 21.35l-1.45-1.32C5.4 15.36 2 12.28 2 8.5 2 5.42 4.42 3 7.5 3c1.74 0 3.41.81 4.5 2.09A6 6 0 0 1 21 8.5c0 3.78-3.4 6.86-8.55 11.54L12 21.35z"/%3E%3C/path%3E');
-    }
 
-    .icon-btn.heart.disabled {
-        opacity: 0.4;
-        cursor: not-allowed;
-    }
+SIZE_SOURCES = (("sqm", 'size_sqm'), ("sqm", 'usable_area'), ("sqm", 'area_sqm'))
+LAND_SOURCES = (("sqm", 'land_size_sqm'), ("sq.wah", 'land_size_sq_wah'), ("rai", 'land_size_rai'), ("sqm", 'land_size'))
 
-    .sale-badge,
-    .meta-pill {
-        padding: 6px 14px;
-        border-radius: 14px;
-        font-size: 12px;
-        font-weight: 600;
-        color: #0F172A;
-        background: rgba(255,255,255,0.92);
-    }
 
-    .sale-badge {
-        text-transform: uppercase;
-        letter-spacing: 0.12em;
-    }
+def attach_display_columns(df):
+    if df is None or df.empty:
+        return df
+    if 'price' in df.columns:
+        # Every NaN is a distinct lru_cache key, so missing prices skip the cache and take its None answer.
+        df['price_display'] = df['price'].map(format_price, na_action='ignore').fillna(format_price(None))
+    for target, sources in (('size_display', SIZE_SOURCES), ('land_display', LAND_SOURCES)):
+        display = pd.Series('—', index=df.index, dtype=object)
+        # Walk the sources last to first so the earliest usable column wins, as in first_valid_measurement.
+        for unit, column in reversed(sources):
+            if column in df.columns:
+                # NaN would miss format_number's cache on every call; format the present values and fill the rest.
+                present = df[column].dropna()
+                formatted = pd.Series(
+                    [format_number(value, unit) for value in present], index=present.index, dtype=object
+                ).reindex(df.index, fill_value='—')
+                display = formatted.where(formatted != '—', display)
+        df[target] = display
+    return df
+
+
+def attach_photo_columns(df):
+    if df is None or df.empty or 'photos' not in df.columns:
+        return df
+    df['photos_list'] = df['photos'].map(extract_all_photos)
+    df['first_photo'] = df['photos_list'].map(pick_cover_photo)
+    return df
+
+
+def pick_cover_photo(photos):
+    """rank_photos already put property shots first, so the cover is the head of the list."""
+    return photos[0] if photos else DEFAULT_PLACEHOLDER_IMAGE
+
+
+def listing_photos(row):
+    photos = row.get('photos_list')
+    if isinstance(photos, list) and photos:
+        return photos
+    return extract_all_photos(row.get('photos'))
+
+
+PHOTO_CAROUSEL_HEIGHT = 700
+
+
+def photo_carousel_html(photos, start_idx, property_type, title, location):
+    """Self-contained viewer that cycles photos in the browser without a rerun."""
+    photos_json = orjson.dumps(photos).decode().replace("</", "<\\/")
+    thumbs = "".join(
+        f"<button class='thumb' data-idx='{idx}'><img src='{url}' alt='thumbnail {idx + 1}'/></button>"
+        for idx, url in enumerate(photos[:12])
+    )
+    return f"""
+    <style>
+        body {{ margin: 0; font-family: 'Inter', 'Segoe UI', sans-serif; color: #e2e8f0; }}
+        .shell {{ background: rgba(5, 10, 23, 0.9); border-radius: 20px; border: 1px solid rgba(148, 163, 184, 0.2); padding: 14px; }}
+        .photo {{ position: relative; border-radius: 16px; overflow: hidden; border: 1px solid rgba(148, 163, 184, 0.25); background: #030712; }}
+        .photo img {{ width: 100%; height: 520px; object-fit: cover; display: block; }}
+        .overlay {{ position: absolute; inset: 0; padding: 18px; display: flex; justify-content: space-between; align-items: flex-end;
+            background: linear-gradient(180deg, rgba(2,6,23,0.0) 0%, rgba(2,6,23,0.85) 100%); color: #fff; pointer-events: none; }}
+        .overlay h3 {{ margin: 6px 0 2px 0; font-size: 22px; }}
+        .overlay p {{ margin: 0; color: #94a3b8; font-size: 14px; }}
+        .pill {{ display: inline-flex; padding: 4px 12px; border-radius: 999px; border: 1px solid rgba(148, 163, 184, 0.35);
+            text-transform: uppercase; letter-spacing: 0.08em; font-size: 11px; background: rgba(17, 24, 39, 0.65); }}
+        .hint {{ font-size: 12px; letter-spacing: 0.08em; text-transform: uppercase; color: rgba(255,255,255,0.75); text-align: right; }}
+        .nav {{ display: grid; grid-template-columns: repeat(3, 1fr); align-items: center; gap: 10px; margin: 12px 0 4px 0; }}
+        .nav button {{ padding: 8px 0; border-radius: 999px; border: 1px solid rgba(148, 163, 184, 0.35);
+            background: rgba(17, 24, 39, 0.65); color: #e2e8f0; font-weight: 600; cursor: pointer; }}
+        .nav button:disabled {{ opacity: 0.4; cursor: default; }}
+        .progress {{ text-align: center; font-size: 13px; font-weight: 600; letter-spacing: 0.08em; }}
+        .thumbs {{ display: flex; gap: 10px; overflow-x: auto; margin-top: 10px; }}
+        .thumb {{ flex: 0 0 110px; height: 70px; padding: 0; border-radius: 12px; overflow: hidden; border: 2px solid transparent; background: none; cursor: pointer; }}
+        .thumb img {{ width: 100%; height: 100%; object-fit: cover; display: block; }}
+        .thumb.active {{ border-color: #1AA7EC; }}
+    </style>
+    <div class='shell' tabindex='0'>
+        <div class='photo'>
+            <img id='hero' src='' alt='property photo'/>
+            <div class='overlay'>
+                <div><div class='pill'>{property_type}</div><h3>{title}</h3><p>{location}</p></div>
+                <div class='hint'>Use arrows or thumbnails</div>
+            </div>
+        </div>
+        <div class='nav'>
+            <button id='prev'>⟵ Previous</button>
+            <div class='progress' id='progress'></div>
+            <button id='next'>Next ⟶</button>
+        </div>
+        <div class='thumbs'>{thumbs}</div>
+    </div>
+    <script>
+        const photos = {photos_json};
+        let idx = {start_idx};
+        const hero = document.getElementById('hero');
+        const thumbs = document.querySelectorAll('.thumb');
+        function show(target) {{
+            idx = Math.max(0, Math.min(target, photos.length - 1));
+            hero.src = photos[idx];
+            hero.alt = 'property photo ' + (idx + 1);
+            document.getElementById('progress').textContent = 'Photo ' + (idx + 1) + '/' + photos.length;
+            document.getElementById('prev').disabled = idx === 0;
+            document.getElementById('next').disabled = idx >= photos.length - 1;
+            thumbs.forEach((thumb) => thumb.classList.toggle('active', Number(thumb.dataset.idx) === idx));
+        }}
+        document.getElementById('prev').onclick = () => show(idx - 1);
+        document.getElementById('next').onclick = () => show(idx + 1);
+        thumbs.forEach((thumb) => thumb.onclick = () => show(Number(thumb.dataset.idx)));
+        document.addEventListener('keydown', (event) => {{
+            if (event.key === 'ArrowLeft') show(idx - 1);
+            if (event.key === 'ArrowRight') show(idx + 1);
+        }});
+        show(idx);
+    </script>
+    """
 
-    .sale-pill {
-        display: inline-flex;
-        padding: 6px 14px;
-        border-radius: 999px;
-        background: rgba(47,180,124,0.12);
-        border: 1px solid var(--border-strong);
-        font-size: 12px;
-        text-transform: uppercase;
-        letter-spacing: 0.12em;
-        color: var(--accent-strong);
-    }
 
-    .card-body {
-        display: flex;
-        flex-direction: column;
-        gap: 12px;
-        cursor: pointer;
-    }
+@lru_cache(maxsize=4096)
+def normalize_property_type(raw_type, fallback_text=""):
+    candidate = (raw_type or "").strip()
+    haystack = f"{candidate} {fallback_text or ''}".lower()
+    matches = find_property_keywords(haystack)
+    if matches:
+        return PROPERTY_TYPE_LABELS[min(map(KEYWORD_TYPE_RANKS.__getitem__, matches))]
+    return candidate.title() if candidate else "Property"
 
-    .card-body h4 {
-        margin: 0;
-        font-size: 20px;
-        color: #0F172A;
-    }
 
-    .card-location {
-        margin: 0;
-        font-size: 14px;
-        color: var(--text-muted);
-    }
+def normalize_property_types(df):
+    """Vectorized normalize_property_type over the property_type and title columns."""
+    empty = pd.Series("", index=df.index, dtype="string[pyarrow]")
+    candidate = df['property_type'].astype("string[pyarrow]").fillna("").str.strip() if 'property_type' in df.columns else empty
+    titles = df['title'].astype("string[pyarrow]").fillna("") if 'title' in df.columns else empty
+    haystack = (candidate + " " + titles).str.lower()
+    result = candidate.str.title().where(candidate != "", "Property")
+    for label in reversed(PROPERTY_KEYWORDS):
+        result = result.mask(haystack.str.contains(PROPERTY_TYPE_PATTERNS[label], regex=True), label)
+    return result.astype(object)
 
-    .spec-row {
-        display: flex;
-        justify-content: space-between;
-        background: #F6FBF8;
-        border-radius: 18px;
-        padding: 10px 14px;
-        font-size: 13px;
-        color: #0F172A;
-    }
 
-    .spec-row span {
-        display: inline-flex;
-        gap: 4px;
-        align-items: baseline;
-    }
-
-    .agent-chip {
-        display: flex;
-        align-items: center;
-        gap: 12px;
-        border: 1px solid rgba(15,23,42,0.08);
-        border-radius: 18px;
-        padding: 10px 14px;
-        background: #FFFFFF;
-        box-shadow: inset 0 1px 0 rgba(255,255,255,0.8);
-    }
-
-    .agent-avatar {
-        width: 38px;
-        height: 38px;
-        border-radius: 14px;
-        background: rgba(33,179,122,0.12);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-    }
-
-    .agent-chip strong {
-        display: block;
-        color: #0F172A;
-    }
-
-    .agent-chip span {
-        font-size: 12px;
-        color: rgba(15,23,42,0.6);
-    }
-
-    .price-cta-row {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        border-top: 1px solid rgba(15,23,42,0.08);
-        padding-top: 14px;
-        gap: 16px;
-    }
-
-    .price-stack {
-        display: flex;
-        flex-direction: column;
-        gap: 4px;
-    }
-
-    .price-stack span {
-        font-size: 12px;
-        letter-spacing: 0.12em;
-        text-transform: uppercase;
-        color: var(--eyebrow);
-    }
-
-    .price-stack strong {
-        font-size: 26px;
-        color: #0F172A;
-    }
-
-    .buy-pill {
-        padding: 14px 28px;
-        border-radius: 18px;
-        border: none;
-        background: linear-gradient(120deg, #21B37A, #1AA7EC);
-        color: #ffffff;
-        font-weight: 600;
-        letter-spacing: 0.04em;
-        text-decoration: none;
-        box-shadow: 0 14px 28px rgba(32,178,123,0.35);
-    }
-
-    .type-chip {
-        display: inline-flex;
-        padding: 6px 14px;
-        border-radius: 999px;
-        border: 1px solid var(--border);
-        color: var(--primary);
-        font-size: 12px;
-        letter-spacing: 0.12em;
-        text-transform: uppercase;
-        background: var(--surface-alt);
-    }
-
-    .location-line {
-        display: flex;
-        flex-direction: column;
-        align-items: flex-start;
-        gap: 6px;
-    }
-
-    .location-text {
-        display: flex;
-        align-items: center;
-        gap: 8px;
-        flex-wrap: wrap;
-    }
-
-    .location-pill {
-        padding: 6px 14px;
-        border-radius: 999px;
-        background: rgba(148, 163, 184, 0.12);
-        border: 1px dashed rgba(148, 163, 184, 0.35);
-        font-size: 13px;
-    }
-
-    .map-action-row {
-        display: flex;
-        align-items: center;
-        gap: 8px;
-        flex-wrap: wrap;
-        margin-top: 6px;
-    }
-
-    .map-action-row.inline {
-        min-height: 36px;
-    }
-
-    .map-action-row.inline.placeholder .map-placeholder {
-        padding: 6px 12px;
-        border-radius: 10px;
-        background: rgba(148, 163, 184, 0.08);
-        border: 1px dashed rgba(148, 163, 184, 0.25);
-        font-size: 12px;
-        color: var(--text-muted);
-    }
-
-    .map-action-label {
-        font-size: 11px;
-        color: var(--text-muted);
-        text-transform: uppercase;
-        letter-spacing: 0.08em;
-    }
-
-    .map-icon {
-        width: 34px;
-        height: 34px;
-        border-radius: 12px;
-        display: inline-flex;
-        align-items: center;
-        justify-content: center;
-        font-weight: 700;
-        color: var(--accent-strong);
-        text-decoration: none;
-        border: 1px solid var(--border);
-        background: var(--surface-alt);
-        box-shadow: inset 0 1px 0 rgba(255,255,255,0.6);
-    }
-
-    .map-icon span {
-        font-size: 11px;
-        letter-spacing: 0.08em;
-        color: inherit;
-    }
-
-    .map-icon.google,
-    .map-icon.apple {
-        background: var(--panel);
-        color: var(--text);
-    }
-
-    .detail-location-card {
-        border: 1px dashed var(--border);
-        border-radius: 16px;
-        padding: 14px;
-        background: var(--panel);
-        margin-top: 12px;
-    }
-
-    .price-chip {
-        min-width: 130px;
-        padding: 8px 12px;
-        border-radius: 12px;
-        border: 1px solid var(--border);
-        background: var(--panel);
-        text-align: right;
-    }
-
-    .price-chip .primary {
-        font-size: 18px;
-        font-weight: 700;
-        color: var(--accent);
-    }
-
-    .price-chip .secondary {
-        font-size: 12px;
-        color: var(--text-muted);
-        letter-spacing: 0.08em;
-        text-transform: uppercase;
-    }
-
-    .muted {
-        color: var(--text-muted);
-        font-size: 13px;
-    }
-
-    .quick-meta {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(100px, 1fr));
-        gap: 8px;
-        border: 1px solid var(--border);
-        background: var(--panel);
-        border-radius: 16px;
-        padding: 12px;
-    }
-
-    .quick-meta .item {
-        background: var(--surface-alt);
-        border: 1px solid var(--border);
-        border-radius: 12px;
-        padding: 8px 10px;
-        color: var(--text);
-        box-shadow: 0 8px 16px rgba(17, 24, 39, 0.04);
-    }
-
-    .quick-meta .item span {
-        display: block;
-        font-size: 10px;
-        letter-spacing: 0.08em;
-        color: var(--text-muted);
-        text-transform: uppercase;
-    }
-
-    .quick-meta .item strong {
-        display: block;
-        font-size: 15px;
-        color: var(--text);
-        margin-top: 4px;
-    }
-
-    .compact-meta-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(140px, 1fr));
-        gap: 12px;
-        margin-top: 12px;
-    }
-
-    .compact-meta-grid div {
-        background: var(--surface-alt);
-        border: 1px solid var(--border);
-        border-radius: 18px;
-        padding: 12px 14px;
-        box-shadow: inset 0 1px 0 rgba(255,255,255,0.5);
-    }
-
-    .compact-meta-grid span {
-        font-size: 11px;
-        letter-spacing: 0.14em;
-        color: var(--eyebrow);
-        text-transform: uppercase;
-    }
-
-    .compact-meta-grid strong {
-        display: block;
-        font-size: 16px;
-        color: var(--text);
-        margin-top: 6px;
-    }
-
-    .room-icon-row {
-        display: flex;
-        gap: 10px;
-        flex-wrap: wrap;
-    }
-
-    .room-icon-card {
-        flex: 1 1 140px;
-        min-width: 130px;
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        padding: 8px 12px;
-        border-radius: 14px;
-        background: var(--panel);
-        border: 1px solid var(--border);
-        box-shadow: 0 8px 16px rgba(17, 24, 39, 0.06);
-    }
-
-    .icon-circle {
-        width: 36px;
-        height: 36px;
-        border-radius: 12px;
-        background: var(--surface);
-        border: 1px solid var(--border);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 18px;
-        color: var(--text);
-    }
-
-    .icon-circle.bath {
-        background: rgba(22, 163, 74, 0.12);
-        border-color: rgba(22, 163, 74, 0.4);
-    }
-
-    .room-icon-card span.label {
-        display: block;
-        font-size: 10px;
-        letter-spacing: 0.08em;
-        color: var(--text-muted);
-        text-transform: uppercase;
-    }
-
-    .room-icon-card strong {
-        display: block;
-        font-size: 18px;
-        color: var(--text);
-        margin-top: 4px;
-    }
-
-    .card-body {
-        flex: 1;
-        display: flex;
-        flex-direction: column;
-        gap: 8px;
-    }
-
-    .card-description {
-        margin: 0;
-        color: var(--text);
-        font-size: 13px;
-        line-height: 1.4;
-        display: -webkit-box;
-        -webkit-line-clamp: 3;
-        -webkit-box-orient: vertical;
-        overflow: hidden;
-        min-height: 56px;
-    }
-
-    .card-footer {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        gap: 14px;
-        margin-top: 6px;
-    }
-
-    .card-compact {
-        display: flex;
-        flex-direction: column;
-        gap: 10px;
-        flex: 1;
-        height: 100%;
-        justify-content: space-between;
-    }
-
-    .card-top-row {
-        display: flex;
-        justify-content: space-between;
-        align-items: flex-start;
-        gap: 16px;
-    }
-
-    .card-stat-row {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
-        gap: 10px;
-        margin-top: 6px;
-    }
-
-    .stat-chip {
-        background: rgba(15,23,42,0.06);
-        border-radius: 16px;
-        padding: 10px 14px;
-        box-shadow: inset 0 1px 0 rgba(255,255,255,0.4);
-    }
-
-    .stat-chip span {
-        display: block;
-        font-size: 10px;
-        letter-spacing: 0.12em;
-        text-transform: uppercase;
-        color: var(--eyebrow);
-    }
-
-    .stat-chip strong {
-        display: block;
-        font-size: 17px;
-        color: var(--text);
-        margin-top: 4px;
-    }
-
-    .card-footer-row {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        gap: 12px;
-        flex-wrap: wrap;
-        margin-top: auto;
-        border-top: 1px solid rgba(15,23,42,0.08);
-        padding-top: 12px;
-    }
-
-    .card-footer-actions {
-        display: flex;
-        gap: 10px;
-        flex-wrap: wrap;
-        align-items: center;
-        justify-content: flex-end;
-    }
-
-    .sale-pill {
-        margin-top: 6px;
-        display: inline-flex;
-        padding: 8px 18px;
-        border-radius: 18px;
-        background: rgba(47,180,124,0.12);
-        border: none;
-        font-size: 12px;
-        text-transform: uppercase;
-        letter-spacing: 0.18em;
-        color: var(--accent-strong);
-    }
-    }
-
-    .cta-pill.filled {
-        background: linear-gradient(135deg, rgba(59,130,246,0.8), rgba(59,130,246,0.4));
-        border-color: rgba(59,130,246,0.8);
-        color: #0f172a;
-    }
-
-    .card-description.compact {
-        min-height: auto;
-        -webkit-line-clamp: 2;
-        color: var(--text-muted);
-    }
-
-    .pricing-hint {
-        font-size: 12px;
-        letter-spacing: 0.08em;
-        text-transform: uppercase;
-        font-weight: 600;
-    }
-
-    .pricing-hint.good {color: var(--accent);}
-    .pricing-hint.fair {color: #fbbf24;}
-    .pricing-hint.bad {color: var(--danger);}
-
-    .detail-info-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(160px, 1fr));
-        gap: 10px;
-        margin: 12px 0 8px 0;
-    }
-
-    .detail-page-shell {
-        margin: 12px 0;
-    }
-
-    .cta-heart {
-        display: inline-flex;
-        align-items: center;
-        gap: 6px;
-        text-decoration: none;
-    }
-
-    .price-chip {
-        min-width: 140px;
-        padding: 12px 16px;
-        border-radius: 18px;
-        border: none;
-        background: #0c2a1f;
-        text-align: right;
-        color: #f8fafc;
-        box-shadow: inset 0 1px 0 rgba(255,255,255,0.18);
-    }
-
-    .price-chip .primary {
-        font-size: 22px;
-        font-weight: 700;
-        color: #ffffff;
-    }
-
-    .price-chip .secondary {
-        font-size: 11px;
-        color: rgba(255,255,255,0.68);
-        letter-spacing: 0.18em;
-        text-transform: uppercase;
-    }
-    .detail-hero-overlay h2 {
-        margin: 4px 0;
-        font-size: 28px;
-        color: #ffffff;
-    }
-
-    .detail-hero-overlay p {
-        margin: 0;
-        color: #e2e8f0;
-    }
-
-    .detail-hero-actions {
-        display: flex;
-        flex-direction: column;
-        gap: 10px;
-    }
-
-    .detail-info-grid .detail-stat {
-        background: var(--panel);
-        border-radius: 12px;
-        border: 1px solid var(--border);
-        padding: 10px 12px;
-    }
-
-    .detail-info-grid .detail-stat span {
-        display: block;
-        font-size: 11px;
-        color: var(--text-muted);
-        text-transform: uppercase;
-        letter-spacing: 0.08em;
-    }
-
-    .detail-info-grid .detail-stat strong {
-        display: block;
-        margin-top: 4px;
-        font-size: 16px;
-        color: var(--text);
-    }
-
-    .detail-body {
-        background: var(--panel);
-        border-radius: 14px;
-        border: 1px solid var(--border);
-        padding: 14px;
-        margin-top: 8px;
-    }
-
-    .detail-body h4 {
-        margin: 0 0 6px 0;
-        font-size: 16px;
-    }
-
-    .detail-body p {
-        margin: 0 0 8px 0;
-        color: #e2e8f0;
-        line-height: 1.4;
-        font-size: 14px;
-    }
-
-    .detail-body .detail-duo {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-        gap: 12px;
-        margin-top: 10px;
-    }
-
-    .detail-links {
-        display: flex;
-        justify-content: space-between;
-        gap: 10px;
-        flex-wrap: wrap;
-        margin-top: 12px;
-    }
-
-    .price-chip {
-        min-width: 150px;
-        padding: 10px 16px;
-        border-radius: 20px;
-        border: 1px solid var(--border);
-        background: var(--surface-alt);
-        text-align: right;
-    }
-
-    .price-chip .primary {
-        font-size: 22px;
-        font-weight: 700;
-        color: var(--text);
-    }
-
-    .price-chip .secondary {
-        font-size: 11px;
-        color: var(--eyebrow);
-        letter-spacing: 0.18em;
-        text-transform: uppercase;
-    }
-        color: var(--text);
-        text-decoration: none;
-        font-weight: 600;
-        font-size: 13px;
-    }
-
-    .cta-heart.saved {
-        background: var(--accent);
-        color: #ffffff;
-        border-color: var(--accent);
-    }
-
-    .price-bar-wrapper {
-        margin-top: 14px;
-        min-height: 78px;
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-    }
-
-    .price-bar-wrapper.spacer {
-        justify-content: flex-end;
-    }
-
-    .price-bar-track {
-        position: relative;
-        height: 10px;
-        border-radius: 999px;
-        background: rgba(15,23,42,0.08);
-        box-shadow: inset 0 1px 2px rgba(17, 24, 39, 0.04);
-    }
-
-    .price-bar-indicator {
-        position: absolute;
-        top: -4px;
-        width: 3px;
-        height: 18px;
-        border-radius: 2px;
-        background: var(--accent);
-        box-shadow: 0 0 0 5px rgba(47, 180, 124, 0.25);
-    }
-
-    .price-bar-labels {
-        display: flex;
-        justify-content: space-between;
-        font-size: 10px;
-        color: var(--eyebrow);
-        margin-top: 4px;
-        letter-spacing: 0.12em;
-    }
-
-    .price-compare {
-        margin-top: 6px;
-        font-size: 13px;
-        font-weight: 600;
-        color: var(--text-muted);
-    }
-
-    .price-compare.good {color: var(--accent);}
-    .price-compare.fair {color: var(--text-muted);}
-    .price-compare.bad {color: var(--danger);}
-
-    .value-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-        gap: 14px;
-        margin-top: 16px;
-    }
-
-    .value-chip {
-        background: #0f2c21;
-        border-radius: 22px;
-        padding: 16px;
-        display: flex;
-        flex-direction: column;
-        gap: 8px;
-        color: #e0fbea;
-    }
-
-    .value-chip-header {
-        display: flex;
-        align-items: center;
-        gap: 6px;
-    }
-
-    .value-chip .value-label {
-        font-size: 11px;
-        letter-spacing: 0.18em;
-        text-transform: uppercase;
-        color: rgba(255,255,255,0.65);
-    }
-
-    .value-chip .value-icon {
-        font-size: 16px;
-        line-height: 1;
-    }
-
-    .value-chip strong {
-        font-size: 22px;
-        color: #5ef1b1;
-    }
-
-    .thumb-row {
-        display: flex;
-        gap: 8px;
-        flex-wrap: wrap;
-        margin: 12px 0;
-    }
-
-    .thumb-link {
-        width: 110px;
-        height: 70px;
-        border-radius: 12px;
-        overflow: hidden;
-        border: 2px solid transparent;
-        display: block;
-    }
-
-    .thumb-link img {
-        width: 100%;
-        height: 100%;
-        object-fit: cover;
-        display: block;
-    }
-
-
-    .modal-shell {
-        background: rgba(5, 10, 23, 0.9);
-        border-radius: 20px;
-        border: 1px solid rgba(148, 163, 184, 0.2);
-        padding: 14px;
-        box-shadow: 0 20px 45px rgba(2, 6, 23, 0.85);
-        margin-bottom: 14px;
-    }
-
-    .modal-photo-wrapper {
-        position: relative;
-        border-radius: 16px;
-        overflow: hidden;
-        border: 1px solid rgba(148, 163, 184, 0.25);
-        background: #030712;
-    }
-
-    .modal-photo-wrapper img {
-        width: 100%;
-        height: 520px;
-        object-fit: cover;
-        display: block;
-    }
-
-    .modal-photo-overlay {
-        position: absolute;
-        inset: 0;
-        padding: 18px;
-        display: flex;
-        justify-content: space-between;
-        align-items: flex-end;
-        background: linear-gradient(180deg, rgba(2,6,23,0.0) 0%, rgba(2,6,23,0.85) 100%);
-        color: #ffffff;
-        pointer-events: none;
-    }
-
-    .modal-photo-overlay h3 {
-        margin: 6px 0 2px 0;
-        font-size: 22px;
-    }
-
-    .modal-photo-overlay p {
-        margin: 0;
-        color: var(--text-muted);
-        font-size: 14px;
-    }
-
-    .modal-pill {
-        display: inline-flex;
-        padding: 4px 12px;
-        border-radius: 999px;
-        border: 1px solid rgba(148, 163, 184, 0.35);
-        text-transform: uppercase;
-        letter-spacing: 0.08em;
-        font-size: 11px;
-        background: rgba(17, 24, 39, 0.65);
-    }
-
-    .modal-hint {
-        font-size: 12px;
-        letter-spacing: 0.08em;
-        text-transform: uppercase;
-        color: rgba(255,255,255,0.75);
-        text-align: right;
-    }
-
-    .modal-nav-grid {
-        margin: 6px 0 4px 0;
-    }
-
-    .modal-nav-grid div[data-testid="stButton"] button {
-        width: 100%;
-        border-radius: 999px;
-        border: 1px solid rgba(148, 163, 184, 0.35);
-        background: rgba(17, 24, 39, 0.65);
-        color: #e2e8f0;
-        font-weight: 600;
-    }
-
-    .modal-nav-grid div[data-testid="stButton"] button:disabled {
-        opacity: 0.4;
-    }
-
-    .modal-chip {
-        text-align: center;
-        padding: 8px 0;
-        letter-spacing: 0.08em;
-    }
-
-    .modal-thumb-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(110px, 1fr));
-        gap: 10px;
-        margin: 12px 0 6px 0;
-    }
-
-    .modal-thumb-grid a {
-        border-radius: 12px;
-        overflow: hidden;
-        border: 2px solid transparent;
-        display: block;
-        height: 70px;
-    }
-
-    .modal-thumb-grid a img {
-        width: 100%;
-        height: 100%;
-        object-fit: cover;
-        display: block;
-    }
-
-    .modal-thumb-grid a.active {
-        border-color: var(--primary);
-    }
-
-    .modal-close-row {
-        display: flex;
-        justify-content: flex-end;
-        margin-top: 4px;
-    }
-
-    .modal-close-row div[data-testid="stButton"] button {
-        border-radius: 999px;
-        background: rgba(239, 68, 68, 0.18);
-        border: 1px solid rgba(239, 68, 68, 0.35);
-        color: #fecaca;
-    }
-
-    .original-pill {
-        font-size: 11px;
-        color: var(--text-muted);
-        text-transform: uppercase;
-        letter-spacing: 0.08em;
-    }
-
-    .original-note {
-        font-size: 12px;
-        color: var(--text-muted);
-        margin-top: 4px;
-    }
-
-    .login-hint {
-        font-size: 13px;
-        color: var(--text-muted);
-    }
-
-    .property-grid-row div[data-testid="column"] > div {
-        height: 100%;
-    }
-
-    @media (min-width: 900px) {
-        .property-grid-row div[data-testid="column"] {
-            flex: 1 1 calc(50% - 20px);
-        }
-    }
-
-    @media (max-width: 1100px) {
-        .property-grid-row div[data-testid="column"] {
-            flex: 1 1 calc(50% - 22px);
-        }
-
-        .photo-link img {
-            height: 200px;
-        }
-    }
-
-    @media (max-width: 768px) {
-        .top-nav {
-            flex-direction: column;
-            align-items: flex-start;
-        }
-
-        .card-cta-row {
-            flex-direction: column;
-            align-items: flex-start;
-        }
-
-        .price-stack {
-            width: 100%;
-        }
-
-        .buy-pill {
-            width: 100%;
-            justify-content: center;
-        }
-
-        .property-grid-row div[data-testid="column"] {
-            flex: 1 1 100%;
-        }
-
-        .photo-link img {
-            height: 180px;
-        }
-    }
-
-    .bottom-app-nav {
-        position: sticky;
-        bottom: 12px;
-        width: 100%;
-        margin-top: 24px;
-    }
-
-    .bottom-app-nav .nav-shell {
-        display: grid;
-        grid-template-columns: repeat(4, minmax(0, 1fr));
-        gap: 10px;
-        padding: 10px 22px;
-        border-radius: 999px;
-        border: 1px solid rgba(255,255,255,0.9);
-        background: var(--panel);
-        box-shadow: var(--shadow-soft);
-    }
-
-    .bottom-app-nav div[data-testid="stButton"] > button {
-        background: transparent;
-        border: none;
-        font-weight: 600;
-        color: var(--text-muted);
-        padding: 8px 0;
-    }
-
-    .bottom-app-nav div[data-testid="stButton"] > button[kind="primary"],
-    .bottom-app-nav div[data-testid="stButton"] > button[data-testid="baseButton-primary"] {
-        color: var(--accent-strong);
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-# --- DB HELPER ---
-
-def run_query(query, params=()):
-    try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-        cur.execute(query, params)
-        if query.strip().upper().startswith("SELECT"):
-            col_names = [desc[0] for desc in cur.description]
-            data = cur.fetchall()
-            conn.commit()
-            cur.close()
-            conn.close()
-            return pd.DataFrame(data, columns=col_names)
-        else:
-            conn.commit()
-            cur.close()
-            conn.close()
-            return None
-    except Exception as e:
-        st.error(f"Database Query Failed: {e}")
-        return None
-
-
-@st.cache_data(ttl=600, show_spinner=False)
-def load_properties_df():
-    """Cached wrapper to keep the UI responsive between reruns."""
-    return run_query("SELECT * FROM properties")
-
-
-def sanitize_rich_text(value):
-    if value is None:
-        return ""
-    text = html.unescape(str(value))
-    text = TAG_RE.sub(" ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
-
-
-def clean_text_field(value, default=""):
-    cleaned = sanitize_rich_text(value)
-    return cleaned if cleaned else default
-
-
-def compact_html(html_str):
-    if not html_str:
-        return ""
-    lines = [line.strip() for line in str(html_str).splitlines() if line.strip()]
-    return "".join(lines)
-
-
-def prioritize_photos(urls):
-    ordered = []
-    seen = set()
-    for url in urls:
-        if not url:
-            continue
-        url = url.strip()
-        if not url.lower().startswith("http"):
-            continue
-        if url not in seen:
-            seen.add(url)
-            ordered.append(url)
-
-    def score(url_with_index):
-        idx, url = url_with_index
-        penalty = idx
-        if is_map_like(url):
-            penalty += 200
-        if looks_like_property_photo(url):
-            penalty -= 50
-        return penalty
-
-    indexed = list(enumerate(ordered))
-    prioritized = [url for _, url in sorted(indexed, key=score)]
-    return prioritized
-
-
-def is_map_like(url):
-    if not url:
-        return False
-    lowered = url.lower()
-    return any(keyword in lowered for keyword in PHOTO_AVOID_KEYWORDS)
-
-
-def looks_like_property_photo(url):
-    if not url:
-        return False
-    lowered = url.lower()
-    if any(keyword in lowered for keyword in PHOTO_FAVOR_KEYWORDS):
-        return True
-    if re.search(r"/asset[-_/]", lowered):
-        return True
-    return False
-
-
-def normalize_area_label(value):
-    if not value:
-        return None
-    text = clean_text_field(value)
-    text = text.lower().strip()
-    if not text:
-        return None
-    return text
-
-
-def build_map_links(lat, lon, fallback_location):
-    query = None
-    try:
-        if lat is not None and lon is not None:
-            lat_val = float(lat)
-            lon_val = float(lon)
-            query = f"{lat_val:.6f},{lon_val:.6f}"
-    except (TypeError, ValueError):
-        query = None
-
-    if not query:
-        cleaned = clean_text_field(fallback_location)
-        if cleaned:
-            query = cleaned
-
-    if not query:
-        return {}
-
-    encoded = quote_plus(query)
-    return {
-        "google": f"https://www.google.com/maps/search/?api=1&query={encoded}",
-        "apple": f"https://maps.apple.com/?q={encoded}",
-    }
-
-
-def build_pagination_sequence(current_page, total_pages, window=1):
-    if total_pages <= 7:
-        return list(range(1, total_pages + 1))
-    sequence = [1]
-    left = max(2, current_page - window)
-    right = min(total_pages - 1, current_page + window)
-    if left > 2:
-        sequence.append('...')
-    else:
-        left = 2
-    for page_num in range(left, right + 1):
-        sequence.append(page_num)
-    if right < total_pages - 1:
-        sequence.append('...')
-    sequence.append(total_pages)
-    return sequence
-
-
-def extract_primary_photo(photo_field):
-    if not photo_field:
-        return DEFAULT_PLACEHOLDER_IMAGE
-    photo_text = str(photo_field)
-    candidates = re.split(r"[,|]", photo_text)
-    html_matches = re.findall(r"src=[\"'](http[^\"'>]+)", photo_text)
-    loose_matches = re.findall(r"(https?://[^\s\"'<>]+)", photo_text)
-    prioritized = prioritize_photos(candidates + html_matches + loose_matches)
-    if not prioritized:
-        return DEFAULT_PLACEHOLDER_IMAGE
-    for url in prioritized:
-        if looks_like_property_photo(url):
-            return url
-    for url in prioritized:
-        if not is_map_like(url):
-            return url
-    return prioritized[0]
-
-
-def extract_all_photos(photo_field):
-    if not photo_field:
-        return [DEFAULT_PLACEHOLDER_IMAGE]
-    photo_text = str(photo_field)
-    raw_candidates = re.split(r"[,|]", photo_text)
-    html_matches = re.findall(r"src=[\"'](http[^\"'>]+)", photo_text)
-    loose_matches = re.findall(r"(https?://[^\s\"'<>]+)", photo_text)
-    prioritized = prioritize_photos(raw_candidates + html_matches + loose_matches)
-    if not prioritized:
-        return [DEFAULT_PLACEHOLDER_IMAGE]
-    property_first = [url for url in prioritized if looks_like_property_photo(url)]
-    remainder = [url for url in prioritized if url not in property_first]
-    prioritized = property_first + remainder
-    primary = property_first[0] if property_first else None
-    if primary and prioritized[0] != primary:
-        prioritized = [primary] + [url for url in prioritized if url != primary]
-    return prioritized
+def normalize_area_labels(series):
+    """Lower-cased, trimmed area keys for a location column; blanks become None."""
+    keys = clean_text_series(series).str.lower().str.strip()
+    return keys.where(keys != "", None)
 
 
-def normalize_property_type(raw_type, fallback_text=""):
-    candidate = (raw_type or "").strip()
-    haystack = f"{candidate} {fallback_text or ''}".lower()
-    for label, keywords in PROPERTY_KEYWORDS.items():
-        if any(keyword in haystack for keyword in keywords):
-            return label
-    return candidate.title() if candidate else "Property"
+@st.cache_resource(ttl=600, show_spinner=False)
+def load_listing_view():
+    """Sorted, normalized listings plus an id-to-position map, search text, filter options and price bounds; shared read-only, never copied."""
+    df = load_properties_df()
+    if df is None or df.empty:
+        return df, {}, None, [], [], 0, 0
+    if 'last_updated' in df.columns:
+        df = df.sort_values('last_updated', ascending=False)
+    df['property_type'] = normalize_property_types(df).astype('category')
+    df['area_key'] = normalize_area_labels(df['location']) if 'location' in df.columns else None
+    # Both columns are categorical here, and categories built by astype are the sorted non-null uniques.
+    property_options = df['property_type'].cat.categories.tolist()
+    sale_options = df['sale_channel'].cat.categories.tolist() if 'sale_channel' in df.columns else []
+    # NaN > 0 is False, so the one mask also drops missing prices.
+    positive_prices = df['price'][df['price'] > 0] if 'price' in df.columns else pd.Series(dtype=float)
+    if positive_prices.empty:
+        data_price_min = data_price_max = 0
+    else:
+        data_price_min, data_price_max = int(positive_prices.min()), int(positive_prices.max())
+    if data_price_min == data_price_max:
+        data_price_max = data_price_min + 1000000
+    # Built here so the search text always shares the cached frame's row order.
+    search_text = listing_search_text(df)
+    # Built back to front so the first row with a duplicated id keeps its position, as in find_listing_row.
+    ids = df['id'].tolist() if 'id' in df.columns else []
+    id_positions = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+    return df, id_positions, search_text, property_options, sale_options, data_price_min, data_price_max
 
 
 def ensure_saved_table():
@@ -2049,20 +840,42 @@ def ensure_token_expiry_column():
     run_query("ALTER TABLE users ADD COLUMN IF NOT EXISTS remember_token_expires TIMESTAMPTZ")
 
 
+@st.cache_resource(show_spinner=False)
+def saved_list_versions():
+    """Per-user counters, shared across sessions, that key the saved-list caches."""
+    return {}
+
+
+def saved_list_version(current_user):
+    return saved_list_versions().get(current_user, 0)
+
+
+def bump_saved_list_version(current_user):
+    versions = saved_list_versions()
+    versions[current_user] = versions.get(current_user, 0) + 1
+
+
+class SavedListUnavailable(Exception):
+    """Raised when a saved-list query fails, so the failure is not cached."""
+
+
 def get_saved_property_ids(current_user):
     if not current_user:
-        return set()
+        return frozenset()
+    try:
+        return load_saved_property_ids(current_user, saved_list_version(current_user))
+    except SavedListUnavailable:
+        return frozenset()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_saved_property_ids(current_user, version):
     df = run_query("SELECT property_id FROM saved_properties WHERE username=%s", (current_user,))
-    if df is None or df.empty:
-        return set()
-    cleaned = df['property_id'].dropna().tolist()
-    result = set()
-    for value in cleaned:
-        try:
-            result.add(int(value))
-        except (TypeError, ValueError):
-            continue
-    return result
+    if df is None:
+        raise SavedListUnavailable("saved_properties query failed")
+    if df.empty:
+        return frozenset()
+    return frozenset(pd.to_numeric(df['property_id'], errors='coerce').dropna().astype(int).tolist())
 
 
 def save_property(current_user, property_id):
@@ -2076,29 +889,53 @@ def save_property(current_user, property_id):
         """,
         (current_user, property_id)
     )
+    bump_saved_list_version(current_user)
 
 
 def remove_saved_property(current_user, property_id):
     if not current_user or property_id is None:
         return
     run_query("DELETE FROM saved_properties WHERE username=%s AND property_id=%s", (current_user, property_id))
+    bump_saved_list_version(current_user)
+
+
+def find_listing_row(frame, target_id):
+    """First row with the given id, picked by position so no filtered copy of the frame is built."""
+    if frame is None or frame.empty or 'id' not in frame.columns:
+        return None
+    hits = (frame['id'] == target_id).to_numpy()
+    if not hits.any():
+        return None
+    return frame.iloc[int(hits.argmax())]
 
 
 def fetch_saved_properties(current_user):
     if not current_user:
         return pd.DataFrame()
-    return run_query(
-        """
-        SELECT p.*
-        FROM properties p
-        INNER JOIN saved_properties s ON p.id = s.property_id
-        WHERE s.username=%s
-        ORDER BY s.saved_at DESC
-        """,
+    try:
+        return load_saved_properties(current_user, saved_list_version(current_user))
+    except (ListingsUnavailable, SavedListUnavailable):
+        return pd.DataFrame()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_saved_properties(current_user, version):
+    saved = run_query(
+        "SELECT property_id, saved_at FROM saved_properties WHERE username=%s",
         (current_user,)
     )
+    if saved is None:
+        raise SavedListUnavailable("saved_properties query failed")
+    props = load_properties_df()
+    if saved.empty or props is None or props.empty:
+        return pd.DataFrame()
+    saved['property_id'] = pd.to_numeric(saved['property_id'], errors='coerce')
+    merged = props.merge(saved, left_on='id', right_on='property_id', how='inner')
+    merged = merged.sort_values('saved_at', ascending=False, kind='stable')
+    return merged.drop(columns=['property_id', 'saved_at']).reset_index(drop=True)
 
 
+@lru_cache(maxsize=4096)
 def format_price(value):
     try:
         if value is None:
@@ -2111,16 +948,308 @@ def format_price(value):
         return "Contact for price"
 
 
+@lru_cache(maxsize=1024)
+def format_number(value, unit):
+    try:
+        val = float(value)
+        if math.isnan(val) or val <= 0:
+            return '—'
+        if abs(val - round(val)) < 0.01:
+            val_str = f"{int(round(val)):,}"
+        else:
+            val_str = f"{val:,.1f}"
+        return f"{val_str} {unit}"
+    except (TypeError, ValueError):
+        return '—'
+
+
+def detail_stats_html(stat_blocks):
+    cells = "".join(f"<div class='detail-stat'><span>{label}</span><strong>{value}</strong></div>" for label, value in stat_blocks)
+    return f"<div class='detail-info-grid'>{cells}</div>"
+
+
+def first_valid_measurement(candidates):
+    for unit, raw in candidates:
+        display = format_number(raw, unit)
+        if display != '—':
+            return display
+    return '—'
+
+
+def format_count(value):
+    # Missing counts are NaN, and every NaN is a distinct cache key; answer them before the cache.
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return format_known_count(value)
+
+
+@lru_cache(maxsize=256)
+def format_known_count(value):
+    try:
+        val = float(value)
+        if math.isnan(val) or val <= 0:
+            return None
+        if abs(val - round(val)) < 0.01:
+            return str(int(round(val)))
+        return f"{val:.1f}"
+    except (TypeError, ValueError):
+        return None
+
+
+SALE_CHANNEL_LABELS = {
+    "standard": "Foreclosure Property",
+    "direct_sale": "Foreclosure Property",
+    "auction": "Auction",
+    "short_sale": "Short Sale",
+    "bulk": "Bulk Deal"
+}
+
+
+@lru_cache(maxsize=64)
 def display_sale_channel(channel):
-    mapping = {
-        "standard": "Foreclosure Property",
-        "direct_sale": "Foreclosure Property",
-        "auction": "Auction",
-        "short_sale": "Short Sale",
-        "bulk": "Bulk Deal"
-    }
-    return mapping.get(channel, channel.title() if isinstance(channel, str) else "Sale")
+    return SALE_CHANNEL_LABELS.get(channel, channel.title() if isinstance(channel, str) else "Sale")
+
+
+@lru_cache(maxsize=512)
+def sale_pill_html(sale_label, bank):
+    bank_suffix = ''
+    if sale_label.lower().startswith('foreclosure') and not is_missing_text(bank):
+        bank_suffix = f" · {bank}"
+    return f"<div class='sale-pill'>{sale_label}{bank_suffix}</div>"
+
+
+@lru_cache(maxsize=16)
+def sale_channel_maps(sale_options):
+    display_map = {opt: display_sale_channel(opt) for opt in sale_options}
+    label_groups = {}
+    for opt, label in display_map.items():
+        label_groups.setdefault(label, set()).add(opt)
+    return display_map, {label: frozenset(opts) for label, opts in label_groups.items()}
+
+
+def listing_context(row, language):
+    """Display strings shared by the photo modal and the detail page."""
+    native_title = clean_text_field(row.get('title'), 'Property')
+    native_location = clean_text_field(row.get('location'), 'Location unavailable')
+    native_description = clean_text_field(row.get('description'), '—')
+    native_contact = clean_text_field(row.get('contact'), '—')
+    native_bank = clean_text_field(row.get('bank'), '—')
+
+    if language == "English":
+        title_display = clean_text_field(row.get('title_en')) or native_title
+        location_display = clean_text_field(row.get('location_en')) or native_location
+        description_display = clean_text_field(row.get('description_en')) or native_description
+        contact_display = clean_text_field(row.get('contact_en')) or native_contact
+        bank_display = clean_text_field(row.get('bank_en')) or native_bank
+        description_original = native_description if description_display != native_description else ""
+        contact_original = native_contact if contact_display != native_contact else ""
+        location_original = native_location if location_display != native_location else ""
+    else:
+        title_display = native_title
+        location_display = native_location
+        description_display = native_description
+        contact_display = native_contact
+        bank_display = native_bank
+        description_original = ""
+        contact_original = ""
+        location_original = ""
+
+    property_type_display = row.get('property_type') or normalize_property_type(row.get('property_type'), row.get('title')) or 'Property'
+    bedroom_count = format_count(row.get('bedrooms'))
+    room_count = format_count(row.get('rooms'))
+    rent_value = row.get('rent_estimate')
+    try:
+        rent_display = f"{float(rent_value):,.0f} THB / mo" if rent_value else '—'
+    except (TypeError, ValueError):
+        rent_display = '—'
+
+    return {
+        "native_location": native_location,
+        "title_display": title_display,
+        "location_display": location_display,
+        "description_display": description_display,
+        "contact_display": contact_display,
+        "bank_display": bank_display,
+        "description_original": description_original,
+        "contact_original": contact_original,
+        "location_original": location_original,
+        "property_type_display": clean_text_field(property_type_display, 'Property'),
+        "price_display": row.get('price_display') or format_price(row.get('price')),
+        "size_display": row.get('size_display') or first_valid_measurement([(unit, row.get(column)) for unit, column in SIZE_SOURCES]),
+        "land_display": row.get('land_display') or first_valid_measurement([(unit, row.get(column)) for unit, column in LAND_SOURCES]),
+        "beds_display": bedroom_count or room_count or "—",
+        "bed_label_key": 'beds' if bedroom_count or not room_count else 'rooms',
+        "baths_display": format_count(row.get('bathrooms')) or format_count(row.get('bath_count')) or "—",
+        "rent_display": rent_display,
+        "investment_rating": row.get('investment_rating', '—'),
+    }
+
+
+def listing_card_texts(row, language, translate):
+    """Title, location, bank and contact as shown on a card, translated for English."""
+    native_title = clean_text_field(row.get('title'), 'N/A') or 'N/A'
+    native_location = clean_text_field(row.get('location'), 'N/A') or 'N/A'
+    native_bank = clean_text_field(row.get('bank'), 'N/A') or 'N/A'
+    native_contact = clean_text_field(row.get('contact'), 'N/A') or 'N/A'
+
+    if language != "English":
+        return native_title, native_location, native_bank, native_contact
+    title_t = clean_text_field(row.get('title_en')) or translate(native_title, "en")
+    location_t = clean_text_field(row.get('location_en')) or translate(native_location, "en")
+    bank_t = clean_text_field(row.get('bank_en')) or translate(native_bank, "en")
+    contact_t = clean_text_field(row.get('contact_en')) or translate(native_contact, "en")
+    return title_t, location_t or native_location, bank_t, contact_t
+
+
+def render_listing_card(property_id, row, texts, labels, link_params, is_saved, logged_in):
+    """Card markup for one listing, built from the row and its already-resolved display texts."""
+    beds_label, rooms_label, baths_label, price_label = labels
+    title_t, location_t, bank_t, contact_t = texts
+    base_params = dict(link_params)
+
+    def listing_link(**updates):
+        return f"?{urlencode({**base_params, **updates})}"
+
+    photos = listing_photos(row)
+    first_photo = row.get('first_photo') or pick_cover_photo(photos)
+    property_type_display = row.get('property_type') or normalize_property_type(row.get('property_type'), row.get('title')) or 'Property'
+    property_type_display = clean_text_field(property_type_display, 'Property')
+    photo_count = len(photos)
+    photo_count_label = f"{photo_count} photo{'s' if photo_count != 1 else ''}"
+    photo_href = "#"
+    if property_id is not None:
+        photo_href = listing_link(photo=str(property_id), photo_idx='0')
+
+    price_display = row.get('price_display') or format_price(row.get('price'))
+
+    size_display = row.get('size_display') or first_valid_measurement([(unit, row.get(column)) for unit, column in SIZE_SOURCES])
+    bedroom_count = format_count(row.get('bedrooms'))
+    room_count = format_count(row.get('rooms'))
+    beds_value = bedroom_count or room_count or "—"
+    bed_meta_label = rooms_label if room_count and not bedroom_count else beds_label
+    bath_count_display = format_count(row.get('bathrooms')) or format_count(row.get('bath_count')) or "—"
+    specs_html = (
+        "<div class='spec-row'>"
+        f"<span><strong>{size_display}</strong></span>"
+        f"<span><strong>{beds_value}</strong> {bed_meta_label}</span>"
+        f"<span><strong>{bath_count_display}</strong> {baths_label}</span>"
+        "</div>"
+    )
 
+    sale_channel_value = (row.get('sale_channel') or 'standard').lower()
+    sale_label = display_sale_channel(sale_channel_value)
+    sale_html = sale_pill_html(sale_label, bank_t)
+
+    detail_href = "#"
+    if property_id is not None:
+        detail_href = listing_link(detail=str(property_id))
+
+    if not logged_in:
+        save_html = "<span class='icon-btn heart disabled' title='Login to save'></span>"
+    elif property_id is not None:
+        save_link = listing_link(save=str(property_id), save_op='remove' if is_saved else 'add')
+        heart_class = "icon-btn heart saved" if is_saved else "icon-btn heart"
+        save_html = f"<a class='{heart_class}' href='{save_link}' onclick='event.stopPropagation();' aria-label='Save listing'></a>"
+    else:
+        save_html = ""
+
+    share_html = f"<a class='icon-btn share' href='{detail_href}' onclick=\"event.stopPropagation();\" aria-label='Share listing'></a>" if property_id is not None else ""
+
+    agent_name = "Agent contact pending" if is_missing_text(contact_t) else contact_t
+    agent_meta = sale_label if is_missing_text(bank_t) else bank_t
+    return PROPERTY_CARD_TEMPLATE.format_map({
+        'photo_href': photo_href,
+        'photo_url': first_photo,
+        'title': title_t,
+        'location': location_t,
+        'property_type': property_type_display,
+        'save_html': save_html,
+        'share_html': share_html,
+        'photo_count_label': photo_count_label,
+        'sale_html': sale_html,
+        'detail_href': detail_href,
+        'specs_html': specs_html,
+        'agent_name': agent_name,
+        'agent_meta': agent_meta,
+        'price_label': price_label,
+        'price': price_display,
+    })
+
+
+MAP_COLUMNS = ('lat', 'lon', 'title', 'title_en', 'price', 'price_display', 'location', 'location_en', 'photos', 'first_photo')
+
+
+def build_map_deck(filtered_df):
+    map_subset = [col for col in MAP_COLUMNS if col in filtered_df.columns]
+    map_df = filtered_df[map_subset].dropna(subset=['lat', 'lon']).copy()
+    if map_df.empty:
+        return None
+    map_df = map_df.head(500)
+    for column in ('lat', 'lon'):
+        if map_df[column].dtype != 'float64':
+            map_df[column] = map_df[column].astype('float64')
+
+    map_df['display_title'] = first_text_column(map_df, ['title_en', 'title'], "Untitled asset")
+    map_df['location_display'] = first_text_column(map_df, ['location_en', 'location'], "Location pending")
+    if 'price_display' in map_df.columns:
+        map_df['price_display'] = map_df['price_display'].where(map_df['price'].notna(), "Price on request")
+    elif 'price' in map_df.columns:
+        map_df['price_display'] = map_df['price'].map(format_price, na_action='ignore').fillna("Price on request")
+    else:
+        map_df['price_display'] = "Price on request"
+
+    def resolve_preview_photo(raw_value):
+        if raw_value is None:
+            return DEFAULT_PLACEHOLDER_IMAGE
+        if isinstance(raw_value, float) and math.isnan(raw_value):
+            return DEFAULT_PLACEHOLDER_IMAGE
+        return extract_primary_photo(raw_value)
+
+    if 'first_photo' in map_df.columns:
+        map_df['preview_photo'] = map_df['first_photo'].fillna(DEFAULT_PLACEHOLDER_IMAGE)
+    elif 'photos' in map_df.columns:
+        map_df['preview_photo'] = map_df['photos'].apply(resolve_preview_photo)
+    else:
+        map_df['preview_photo'] = DEFAULT_PLACEHOLDER_IMAGE
+
+    zoom_hint = 12 if len(map_df) < 20 else 10 if len(map_df) < 60 else 9
+    map_records = map_df[
+        ['lat', 'lon', 'display_title', 'price_display', 'location_display', 'preview_photo']
+    ].to_dict(orient="records")
+    tooltip = {
+        "html": (
+            "<div style='width:220px'>"
+            "<strong>{display_title}</strong><br/>"
+            "{price_display}<br/>"
+            "<span style='color:#6b7280'>{location_display}</span><br/>"
+            "<img src='{preview_photo}' style='width:100%;margin-top:6px;border-radius:8px;'/>"
+            "</div>"
+        ),
+        "style": {"backgroundColor": "#ffffff", "color": "#111827", "fontSize": "12px"},
+    }
+    deck_spec = {
+        "mapStyle": "mapbox://styles/mapbox/dark-v11",
+        "initialViewState": {
+            "latitude": float(map_df['lat'].mean()),
+            "longitude": float(map_df['lon'].mean()),
+            "zoom": zoom_hint,
+            "pitch": 0,
+        },
+        "layers": [
+            {
+                "@@type": "ScatterplotLayer",
+                "data": map_records,
+                "getPosition": "[lon, lat]",
+                "getRadius": 350,
+                "getFillColor": [239, 68, 68, 180],
+                "getLineColor": [248, 250, 252],
+                "lineWidthMinPixels": 1,
+                "pickable": True,
+            }
+        ],
+        "tooltip": tooltip,
+    }
+    return JsonDeckSpec(deck_spec)
 
 def get_query_params():
     params = {}
@@ -2135,16 +1264,20 @@ def get_query_params():
     return params
 
 
-def build_query_string(**updates):
-    params = get_query_params()
+def build_query_string(base=None, /, **updates):
+    params = dict(base) if base is not None else get_query_params()
     for key, value in updates.items():
         if value is None:
             params.pop(key, None)
         else:
             params[key] = value
-    if not params:
-        return ""
-    return f"?{urlencode(params)}"
+    return encode_query_items(tuple(params.items()))
+
+
+@lru_cache(maxsize=4096)
+def encode_query_items(items):
+    """urlencode once per distinct set of params; card and thumbnail links repeat them every rerun."""
+    return f"?{urlencode(items)}" if items else ""
 
 
 def clear_query_keys(*keys):
@@ -2156,13 +1289,47 @@ def clear_query_keys(*keys):
         pass
 
 
-ensure_saved_table()
-ensure_token_expiry_column()
+def probe_schema():
+    """(has_saved_table, has_token_expiry) from the catalog; raises when the database can't be read."""
+    result = run_query_rows(
+        """
+        SELECT to_regclass('saved_properties') IS NOT NULL,
+               EXISTS (
+                   SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'users' AND column_name = 'remember_token_expires'
+               )
+        """
+    )
+    if not result or not result[1]:
+        raise RuntimeError("Schema check skipped: database unavailable")
+    return result[1][0]
+
+
+@st.cache_resource(show_spinner=False)
+def ensure_schema():
+    """Probe the catalog once per process and only run the DDL that is missing; raises so an unreachable DB is retried."""
+    has_saved_table, has_token_expiry = probe_schema()
+    if has_saved_table and has_token_expiry:
+        return True
+    if not has_saved_table:
+        ensure_saved_table()
+    if not has_token_expiry:
+        ensure_token_expiry_column()
+    # run_query returns None whether the DDL worked or not, so check the catalog again before caching success.
+    if not all(probe_schema()):
+        raise RuntimeError("Schema setup failed: saved_properties or remember_token_expires still missing")
+    return True
+
+
+try:
+    ensure_schema()
+except RuntimeError:
+    pass
 
 
 def set_remember_token(username):
-    token = uuid.uuid4().hex
-    expires_at = datetime.now(timezone.utc) + timedelta(days=TOKEN_TTL_DAYS)
+    token = secrets.token_urlsafe(24)
+    expires_at = datetime.now(timezone.utc) + TOKEN_TTL
     run_query("UPDATE users SET remember_token=%s, remember_token_expires=%s WHERE username=%s", (token, expires_at, username))
     try:
         st.query_params["session"] = token
@@ -2185,22 +1352,26 @@ def clear_remember_token(username=None):
 
 
 # --- AUTHENTICATOR SETUP ---
+class UsersUnavailable(Exception):
+    """Raised when the users query fails, so the failure is not cached."""
+
+
+@st.cache_data(ttl=300, show_spinner=False)
 def get_users():
-    df = run_query("SELECT username, password, role, is_active FROM users")
-    users = {}
-    if df is not None and not df.empty:
-        for _, row in df.iterrows():
-            if row['is_active']:
-                users[row['username']] = {
-                    'name': row['username'],
-                    'password': row['password'],
-                    'role': row['role']
-                }
-    return users
+    result = run_query_rows("SELECT username, password, role FROM users WHERE is_active=TRUE")
+    if result is None:
+        raise UsersUnavailable("users query failed")
+    return {
+        username: {'name': username, 'password': password, 'role': role}
+        for username, password, role in result[1]
+    }
 
 
 # Prepare credentials map (username -> record)
-users = get_users()
+try:
+    users = get_users()
+except UsersUnavailable:
+    users = {}
 if "auth_status" not in st.session_state:
     st.session_state.auth_status = None
     st.session_state.username = None
@@ -2208,13 +1379,19 @@ if "auth_status" not in st.session_state:
     st.session_state.role = None
 
 
-def refresh_users():
+def refresh_users(force=False):
     global users
-    users = get_users()
+    if force:
+        get_users.clear()
+    try:
+        users = get_users()
+    except UsersUnavailable:
+        # Keep the accounts loaded earlier in this run rather than logging everyone out of admin.
+        pass
 
 
 def authenticate_user(email, password):
-    refresh_users()
+    refresh_users(force=True)
     user = users.get(email)
     if not user:
         return None
@@ -2235,33 +1412,32 @@ def hydrate_session_from_token():
     if not token_list:
         return
     token = token_list[0] if isinstance(token_list, list) else token_list
-    if not token:
+    if not token or token == st.session_state.get('rejected_session_token'):
         return
-    df = run_query("SELECT username, role, remember_token_expires FROM users WHERE remember_token=%s AND is_active=TRUE", (token,))
-    if df is not None and not df.empty:
-        row = df.iloc[0]
-        expiry = row.get('remember_token_expires')
-        expiry_dt = None
-        if expiry is not None and not pd.isna(expiry):
-            if hasattr(expiry, 'to_pydatetime'):
-                expiry_dt = expiry.to_pydatetime()
-            else:
-                expiry_dt = expiry
-        now = datetime.now(timezone.utc)
-        if expiry_dt and expiry_dt < now:
-            clear_remember_token(row.get('username'))
-            return
-        st.session_state.auth_status = True
-        st.session_state.username = row.get('username')
-        st.session_state.name = row.get('username')
-        st.session_state.role = row.get('role', 'client')
-        st.session_state['remember_token'] = token
-        if expiry_dt:
-            st.session_state['remember_token_expiry'] = expiry_dt
-            buffer_delta = timedelta(days=TOKEN_ROTATE_BUFFER_DAYS)
-            if expiry_dt - now <= buffer_delta:
-                set_remember_token(row.get('username'))
-
+    result = run_query_rows(
+        "SELECT username, role, remember_token_expires FROM users WHERE remember_token=%s AND is_active=TRUE LIMIT 1",
+        (token,),
+    )
+    if not result:
+        return
+    if not result[1]:
+        # Unknown token stays in the URL; remember it so later reruns skip the lookup.
+        st.session_state['rejected_session_token'] = token
+        return
+    token_user, role, expiry_dt = result[1][0]
+    now = datetime.now(timezone.utc)
+    if expiry_dt and expiry_dt < now:
+        clear_remember_token(token_user)
+        return
+    st.session_state.auth_status = True
+    st.session_state.username = token_user
+    st.session_state.name = token_user
+    st.session_state.role = role
+    st.session_state['remember_token'] = token
+    if expiry_dt:
+        st.session_state['remember_token_expiry'] = expiry_dt
+        if expiry_dt - now <= TOKEN_ROTATE_BUFFER:
+            set_remember_token(token_user)
 
 hydrate_session_from_token()
 
@@ -2363,11 +1539,102 @@ def render_inline_login_controls(inline=False):
         login_body()
         st.markdown("</div>", unsafe_allow_html=True)
 
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Keep-alive session so repeated translate calls reuse the TLS connection."""
+    session = requests.Session()
+    # Sized like the DB pool: every browser session's script thread shares this one.
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=20))
+    return session
+
+
+@st.cache_resource(show_spinner=False)
+def get_translation_client():
+    """Import and build the GCP client on first use; the gRPC stack is heavy to load."""
+    from google.cloud import translate as translate_client
+    return translate_client.TranslationServiceClient()
+
+
+TRANSLATION_MEMO_LIMIT = 20000
+
+
+@st.cache_resource(show_spinner=False)
+def translation_memo():
+    """Process-wide dict of successful translations; skips st.cache_data's hashing and unpickling on hits."""
+    return {}
+
+
+class TranslationUnavailable(Exception):
+    pass
+
+
+@st.cache_data(persist="disk", max_entries=20000, show_spinner=False)
+def translate_cached(text, target_lang):
+    """(text, channel) persisted to disk across sessions and restarts; failures raise so they are retried."""
+    if target_lang == 'en' and text.isascii():
+        return text, None
+    # Only used when every channel fails; a success drops them so restarts don't replay stale errors.
+    issues = []
+    # Prefer GCP Translate when configured
+    project = get_config_value('GOOGLE_CLOUD_PROJECT')
+    if project and target_lang != 'th':
+        try:
+            client = get_translation_client()
+            parent = f"projects/{project}/locations/global"
+            response = client.translate_text(
+                request={
+                    "parent": parent,
+                    "contents": [text],
+                    "mime_type": "text/plain",
+                    "target_language_code": target_lang,
+                }
+            )
+            if response and response.translations:
+                return clean_text_field(response.translations[0].translated_text, text), 'gcp'
+        except Exception as exc:
+            issues.append(('gcp', f"GCP Translate error: {exc}"))
+    if GOOGLE_TRANSLATE_API_KEY and target_lang != 'th':
+        try:
+            url = "https://translation.googleapis.com/language/translate/v2"
+            payload = {
+                "q": text,
+                "target": target_lang,
+                "format": "text",
+                "key": GOOGLE_TRANSLATE_API_KEY,
+            }
+            response = get_http_session().post(url, data=payload, timeout=8)
+            if response.status_code == 200:
+                data = response.json()
+                return clean_text_field(data['data']['translations'][0]['translatedText'], text), 'api'
+            issues.append(('api', f"Translate API error: {response.text}"))
+        except Exception as exc:
+            issues.append(('api', f"Translate API exception: {exc}"))
+    # Fallback public endpoint
+    try:
+        url = "https://translate.googleapis.com/translate_a/single"
+        params = {
+            "client": "gtx",
+            "sl": "auto",
+            "tl": target_lang,
+            "dt": "t",
+            "q": text
+        }
+        response = get_http_session().get(url, params=params, timeout=5)
+        if response.status_code == 200:
+            result = response.json()
+            return clean_text_field(result[0][0][0], text), None
+    except Exception:
+        pass
+    raise TranslationUnavailable(tuple(issues))
+
+
 # --- DASHBOARD ---
 def main_dashboard():
     refresh_users()
     # Translation cache and helper
     translation_cache = {}
+    shared_translations = translation_memo()
 
     translation_health = {
         "gcp": True,
@@ -2377,156 +1644,29 @@ def main_dashboard():
     st.session_state['translation_health'] = translation_health
 
     def translate_text(text, target_lang):
-        nonlocal translation_health
         if not text:
             return text
         key = (text, target_lang)
+        if key in shared_translations:
+            return shared_translations[key]
         if key in translation_cache:
             return translation_cache[key]
-        def mark_translation_issue(channel, message):
-            translation_health[channel] = False
-            translation_health['last_error'] = message
-        # Prefer GCP Translate when configured
-        project = os.getenv('GOOGLE_CLOUD_PROJECT')
-        if project and target_lang != 'th':
-            try:
-                client = translate_client.TranslationServiceClient()
-                parent = f"projects/{project}/locations/global"
-                response = client.translate_text(
-                    request={
-                        "parent": parent,
-                        "contents": [text],
-                        "mime_type": "text/plain",
-                        "target_language_code": target_lang,
-                    }
-                )
-                if response and response.translations:
-                    translated = clean_text_field(response.translations[0].translated_text, text)
-                    translation_cache[key] = translated
-                    translation_health['gcp'] = True
-                    return translated
-            except Exception as exc:
-                mark_translation_issue('gcp', f"GCP Translate error: {exc}")
-        if GOOGLE_TRANSLATE_API_KEY and target_lang != 'th':
-            try:
-                url = "https://translation.googleapis.com/language/translate/v2"
-                payload = {
-                    "q": text,
-                    "target": target_lang,
-                    "format": "text",
-                    "key": GOOGLE_TRANSLATE_API_KEY,
-                }
-                response = requests.post(url, data=payload, timeout=8)
-                if response.status_code == 200:
-                    data = response.json()
-                    translated = clean_text_field(data['data']['translations'][0]['translatedText'], text)
-                    translation_cache[key] = translated
-                    translation_health['api'] = True
-                    return translated
-                mark_translation_issue('api', f"Translate API error: {response.text}")
-            except Exception as exc:
-                mark_translation_issue('api', f"Translate API exception: {exc}")
-        # Fallback public endpoint
-        try:
-            url = "https://translate.googleapis.com/translate_a/single"
-            params = {
-                "client": "gtx",
-                "sl": "auto",
-                "tl": target_lang,
-                "dt": "t",
-                "q": text
-            }
-            response = requests.get(url, params=params, timeout=5)
-            if response.status_code == 200:
-                result = response.json()
-                translated = clean_text_field(result[0][0][0], text)
-                translation_cache[key] = translated
-                return translated
-        except Exception:
-            pass
-        translation_cache[key] = text
-        return text
-
-    def format_number(value, unit):
-        try:
-            val = float(value)
-            if math.isnan(val) or val <= 0:
-                return '—'
-            if abs(val - round(val)) < 0.01:
-                val_str = f"{int(round(val)):,}"
-            else:
-                val_str = f"{val:,.1f}"
-            return f"{val_str} {unit}"
-        except (TypeError, ValueError):
-            return '—'
-
-    def first_valid_measurement(candidates):
-        for unit, raw in candidates:
-            display = format_number(raw, unit)
-            if display != '—':
-                return display
-        return '—'
-
-    def format_count(value):
         try:
-            if value is None:
-                return None
-            val = float(value)
-            if math.isnan(val) or val <= 0:
-                return None
-            if abs(val - round(val)) < 0.01:
-                return str(int(round(val)))
-            return f"{val:.1f}"
-        except (TypeError, ValueError):
-            return None
-
-    # UI labels
-    labels = {
-            "English": {
-                "market": "Market Opportunities",
-                "min_price": "Min Price (THB)",
-                "max_price": "Max Price (THB)",
-                "property_type": "Property Type",
-                "rooms": "Rooms",
-                "bathrooms": "Bathrooms",
-                "listings_found": "Listings Found",
-                "page": "Page",
-                "price": "Price",
-                "location": "Location",
-                "description": "Description",
-                "contact": "Contact",
-                "living_rating": "Living Condition Rating",
-                "rent_estimate": "Rent Estimate",
-                "investment_rating": "Investment Rating",
-                "bank": "Bank",
-                "beds": "Bedrooms",
-                "baths": "Bathrooms",
-                "land_size": "Land Size",
-                "size_label": "Living Area"
-            },
-            "ไทย": {
-                "market": "โอกาสในตลาด",
-                "min_price": "ราคาขั้นต่ำ (บาท)",
-                "max_price": "ราคาสูงสุด (บาท)",
-                "property_type": "ประเภทอสังหาริมทรัพย์",
-                "rooms": "จำนวนห้อง",
-                "bathrooms": "จำนวนห้องน้ำ",
-                "listings_found": "รายการที่พบ",
-                "page": "หน้า",
-                "price": "ราคา",
-                "location": "ที่ตั้ง",
-                "description": "รายละเอียด",
-                "contact": "ติดต่อ",
-                "living_rating": "คะแนนสภาพความเป็นอยู่",
-                "rent_estimate": "ประมาณค่าเช่า",
-                "investment_rating": "คะแนนการลงทุน",
-                "bank": "ธนาคาร",
-                "beds": "ห้องนอน",
-                "baths": "ห้องน้ำ",
-                "land_size": "พื้นที่ที่ดิน",
-                "size_label": "พื้นที่ใช้สอย"
-            }
-    }
+            translated, channel = translate_cached(text, target_lang)
+            issues = ()
+            store = shared_translations
+        except TranslationUnavailable as exc:
+            translated, channel, issues = text, None, exc.args[0]
+            store = translation_cache
+        for issue_channel, message in issues:
+            translation_health[issue_channel] = False
+            translation_health['last_error'] = message
+        if channel:
+            translation_health[channel] = True
+        if store is shared_translations and len(store) >= TRANSLATION_MEMO_LIMIT:
+            store.clear()
+        store[key] = translated
+        return translated
 
     lang = st.session_state.get("lang_select", "English")
     show_original = st.session_state.get("show_original", False)
@@ -2571,19 +1711,41 @@ def main_dashboard():
                 remove_saved_property(username, save_id)
             else:
                 save_property(username, save_id)
-            st.session_state.pop('saved_ids', None)
-            st.session_state.pop('saved_ids_owner', None)
         except (TypeError, ValueError):
             pass
         clear_query_keys('save', 'save_op')
         st.rerun()
 
+    def select_app_nav(nav_label):
+        # Runs as an on_click callback, so the new view is in session state before the script reruns.
+        st.session_state['bottom_nav_active'] = nav_label
+        if nav_label == 'Account':
+            st.session_state['account_panel_open'] = True
+            st.session_state['focus_section'] = 'account'
+        else:
+            st.session_state['view_mode'] = 'saved' if nav_label == 'Wishlist' else 'all'
+            st.session_state['focus_section'] = 'map' if nav_label == 'Explore' else 'top'
+            st.session_state['account_panel_open'] = False
+
     def render_admin_sidebar():
         if not is_admin:
             return
         with st.sidebar:
             st.title("👑 Admin Deck")
             st.info(f"Signed in as {username}")
+            rescan = st.session_state.get('rescan_process')
+            rescan_running = rescan is not None and rescan.poll() is None
+            if rescan_running:
+                st.caption("Sniper Engine scan running…")
+            elif rescan is not None:
+                st.session_state.pop('rescan_process', None)
+                load_properties_df.clear()
+                load_listing_view.clear()
+                if rescan.returncode == 0:
+                    st.success("Scan Complete. Listings refreshed.")
+                else:
+                    # Listings are still reloaded in case the scan wrote some rows before it failed.
+                    st.error(f"Scan failed: sniper_engine.py exited with code {rescan.returncode}.")
             show_admin = st.checkbox("Show Admin Panel", value=False, key="admin_panel_toggle")
             if show_admin:
                 with st.expander("User Management", expanded=False):
@@ -2591,35 +1753,33 @@ def main_dashboard():
                     new_p = st.text_input("New Pass", key="admin_new_pass")
                     if st.button("Create Client", key="admin_create_client"):
                         run_query("INSERT INTO users (username, password, role) VALUES (%s, %s, 'client')", (new_u, new_p))
-                        refresh_users()
+                        refresh_users(force=True)
                         st.success("User Created!")
-                if st.button("🔄 Force Rescan Now", key="admin_rescan"):
+                if st.button("🔄 Force Rescan Now", key="admin_rescan", disabled=rescan_running):
+                    # Detached so the scan doesn't hold this script thread; completion is picked up on a later rerun.
+                    st.session_state['rescan_process'] = subprocess.Popen(
+                        [sys.executable, os.path.join(APP_DIR, "sniper_engine.py")],
+                        cwd=APP_DIR,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        start_new_session=True,
+                    )
                     st.toast("Triggering Sniper Engine...")
-                    os.system("python sniper_engine.py")
-                    st.success("Scan Complete. Refreshing...")
                     st.rerun()
 
     with st.sidebar:
         if st.button("↻ Refresh listings", key="refresh_cache_btn"):
             load_properties_df.clear()
+            load_listing_view.clear()
             st.toast("Reloading latest feed…")
             st.rerun()
 
     render_admin_sidebar()
 
-    def load_saved_ids():
-        if not authentication_status or not username:
-            return set()
-        owner = st.session_state.get('saved_ids_owner')
-        if owner != username or 'saved_ids' not in st.session_state:
-            st.session_state['saved_ids'] = get_saved_property_ids(username)
-            st.session_state['saved_ids_owner'] = username
-        return st.session_state.get('saved_ids', set())
-
-    saved_ids = load_saved_ids()
+    saved_ids = get_saved_property_ids(username) if authentication_status else frozenset()
     saved_count = len(saved_ids)
 
-    l = labels.get(lang, labels["English"])
+    l = UI_LABELS.get(lang, UI_LABELS["English"])
     greeting_hour = datetime.now().hour
     if greeting_hour < 12:
         greeting_text = "Good Morning"
@@ -2630,43 +1790,11 @@ def main_dashboard():
     hero_name = username.title() if username else "Guest Explorer"
     hero_initials = (username[:2] if username else "TG").upper()
 
-    df = load_properties_df()
-    if df is None or df.empty:
-        property_options = []
-        sale_options = []
-        avg_price_by_area = {}
-        data_price_min = 0
-        data_price_max = 0
-    else:
-        df = df.copy()
-        if 'last_updated' in df.columns:
-            df = df.sort_values('last_updated', ascending=False)
-        df['property_type'] = df.apply(lambda row: normalize_property_type(row.get('property_type'), row.get('title')), axis=1)
-        df['area_key'] = df.get('location').apply(normalize_area_label) if 'location' in df.columns else None
-        df['price_numeric'] = pd.to_numeric(df.get('price'), errors='coerce') if 'price' in df.columns else None
-        if 'area_key' in df.columns and 'price_numeric' in df.columns:
-            area_price_df = df[(df['area_key'].notna()) & (df['price_numeric'] > 0)]
-            avg_price_by_area = area_price_df.groupby('area_key')['price_numeric'].mean().to_dict()
-        else:
-            avg_price_by_area = {}
-
-        property_options = sorted(df['property_type'].dropna().unique()) if 'property_type' in df.columns else []
-        sale_options = sorted(df['sale_channel'].dropna().unique()) if 'sale_channel' in df.columns else []
-        price_series = df['price'].dropna() if 'price' in df.columns else pd.Series(dtype=float)
-        positive_prices = price_series[price_series > 0] if not price_series.empty else pd.Series(dtype=float)
-        data_price_min = int(positive_prices.min()) if not positive_prices.empty else 0
-        data_price_max = int(positive_prices.max()) if not positive_prices.empty else 0
-        if data_price_min == data_price_max:
-            data_price_max = data_price_min + 1000000
-
-    st.markdown("<div id='top-anchor'></div>", unsafe_allow_html=True)
-
-    hero_categories = [
-        {"label": "House", "icon": "🏠", "aliases": ["Single House", "House", "Townhouse", "Townhome"]},
-        {"label": "Villa", "icon": "🏡", "aliases": ["Villa", "Single House", "House"]},
-        {"label": "Apart.", "icon": "🏢", "aliases": ["Condo", "Apartment"]},
-        {"label": "Hotel", "icon": "🏨", "aliases": ["Hotel", "Commercial"]},
-    ]
+    try:
+        df, id_positions, search_text, property_options, sale_options, data_price_min, data_price_max = load_listing_view()
+    except ListingsUnavailable:
+        # run_query_rows already reported the error; render an empty view and try again next rerun.
+        df, id_positions, search_text, property_options, sale_options, data_price_min, data_price_max = None, {}, None, [], [], 0, 0
 
     def derive_focus_location(dataframe):
         if isinstance(dataframe, pd.DataFrame) and not dataframe.empty and 'area_key' in dataframe.columns:
@@ -2679,47 +1807,23 @@ def main_dashboard():
         return "Thailand"
 
     def determine_active_category(selected_value):
-        if not selected_value or selected_value == "All":
-            return "All"
-        for cat in hero_categories:
-            if selected_value in cat.get('aliases', []):
-                return cat['label']
-        return "All"
+        return HERO_CATEGORY_BY_ALIAS.get(selected_value, "All")
+
+    available_types = set(property_options)
 
     def resolve_category_value(cat_entry):
-        aliases = cat_entry.get('aliases', [])
-        for alias in aliases:
-            if alias in property_options:
-                return alias
-        return None
+        return next((alias for alias in cat_entry.get('aliases', []) if alias in available_types), None)
 
     current_choice = st.session_state.get('property_type_choice', "All")
     hero_focus_location = st.session_state.get('hero_focus_location') or derive_focus_location(df)
     st.session_state['hero_focus_location'] = hero_focus_location
     st.session_state['hero_category_active'] = determine_active_category(current_choice)
 
-    st.markdown("<div class='hero-shell'>", unsafe_allow_html=True)
-
-    hero_html = compact_html(
-        f"""
-        <div class='hero-topline'>
-            <div class='hero-location-chip'>
-                <div class='hero-location-icon'>📍</div>
-                <div>
-                    <label>Focus area</label>
-                    <strong>{hero_focus_location}</strong>
-                </div>
-            </div>
-            <div class='hero-alert-bubble'>🔔</div>
-        </div>
-        <div class='hero-heading'>
-            <div class='hero-eyebrow-small'>{greeting_text}</div>
-            <h1>Search your house by Jesp</h1>
-            <p>Hand-picked deals for {hero_name} across {hero_focus_location}.</p>
-        </div>
-        """
+    hero_html = HERO_HEADING_TEMPLATE.format(
+        focus_location=hero_focus_location,
+        greeting=greeting_text,
+        hero_name=hero_name,
     )
-    st.markdown(hero_html, unsafe_allow_html=True)
 
     total_listings = len(df) if isinstance(df, pd.DataFrame) else 0
     market_span = "—"
@@ -2730,11 +1834,14 @@ def main_dashboard():
         ("Market span", market_span),
         ("Watchlist", str(saved_count)),
     ]
-    stat_html = "<div class='stat-slab'>"
-    for label_text, value_text in hero_stats:
-        stat_html += f"<div class='stat-card'><label>{label_text}</label><strong>{value_text}</strong></div>"
-    stat_html += "</div>"
-    st.markdown(stat_html, unsafe_allow_html=True)
+    stat_cards = "".join(
+        f"<div class='stat-card'><label>{label_text}</label><strong>{value_text}</strong></div>"
+        for label_text, value_text in hero_stats
+    )
+    st.markdown(
+        f"<div id='top-anchor'></div><div class='hero-shell'>{hero_html}<div class='stat-slab'>{stat_cards}</div></div>",
+        unsafe_allow_html=True,
+    )
 
     st.markdown("<div class='hero-search-group'>", unsafe_allow_html=True)
     search_cols = st.columns([5, 1, 1], gap="small")
@@ -2747,19 +1854,15 @@ def main_dashboard():
             label_visibility="collapsed",
         )
         keyword = (keyword or "").strip()
-        st.markdown("</div>", unsafe_allow_html=True)
     with search_cols[1]:
         st.markdown("<div class='round-icon-button'>", unsafe_allow_html=True)
         st.button("Filters", key="filters_trigger", use_container_width=True)
-        st.markdown("</div>", unsafe_allow_html=True)
     with search_cols[2]:
         st.markdown("<div class='round-icon-button'>", unsafe_allow_html=True)
         st.button("Voice", key="voice_trigger", use_container_width=True)
-        st.markdown("</div>", unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
 
     st.markdown("<div class='category-pills'>", unsafe_allow_html=True)
-    category_cols = st.columns(len(hero_categories) + 1, gap="small")
+    category_cols = st.columns(len(HERO_CATEGORIES) + 1, gap="small")
     with category_cols[0]:
         is_active = st.session_state.get('hero_category_active') == "All"
         btn_type = "primary" if is_active else "secondary"
@@ -2767,12 +1870,12 @@ def main_dashboard():
             st.session_state['property_type_choice'] = "All"
             st.session_state['property_type_select'] = "All"
             st.session_state['hero_category_active'] = "All"
-    for idx, cat in enumerate(hero_categories, start=1):
+    for idx, cat in enumerate(HERO_CATEGORIES, start=1):
         with category_cols[idx]:
             target_value = resolve_category_value(cat)
             is_active = st.session_state.get('hero_category_active') == cat['label']
             btn_type = "primary" if is_active else "secondary"
-            cat_key = re.sub(r'[^A-Za-z0-9]+', '_', cat['label'])
+            cat_key = NON_ALNUM_RE.sub('_', cat['label'])
             clicked = st.button(
                 f"{cat['icon']} {cat['label']}",
                 key=f"hero_cat_{cat_key}",
@@ -2789,7 +1892,6 @@ def main_dashboard():
                     st.session_state['property_type_choice'] = "All"
                     st.session_state['property_type_select'] = "All"
                     st.session_state['hero_category_active'] = "All"
-    st.markdown("</div>", unsafe_allow_html=True)
 
     st.markdown("<div class='control-bar'>", unsafe_allow_html=True)
     control_cols = st.columns([1.1, 0.9, 0.7, 0.9], gap="small")
@@ -2808,7 +1910,6 @@ def main_dashboard():
             use_container_width=True,
             disabled=not username,
         )
-        st.markdown("</div>", unsafe_allow_html=True)
         if heart_clicked and username:
             new_mode = 'all' if st.session_state['view_mode'] == 'saved' else 'saved'
             st.session_state['view_mode'] = new_mode
@@ -2823,13 +1924,10 @@ def main_dashboard():
             st.markdown("<div class='nav-chip'>Guest mode</div>", unsafe_allow_html=True)
             with st.popover("Login to save"):
                 render_inline_login_controls(inline=True)
-    st.markdown("</div>", unsafe_allow_html=True)
 
     if not authentication_status:
         render_inline_login_controls()
 
-    st.markdown("</div>", unsafe_allow_html=True)
-
     if isinstance(df, pd.DataFrame) and not df.empty:
         recommend_df = df.head(4)
         if not recommend_df.empty:
@@ -2837,17 +1935,18 @@ def main_dashboard():
                 "<div class='recommend-title'><h3>Recommended for you</h3><span class='nav-chip'>Fresh intel</span></div>",
                 unsafe_allow_html=True,
             )
-            cards_html = "<div class='recommend-cards'>"
-            for _, rec_row in recommend_df.iterrows():
+            cards_buf = []
+            link_base = get_query_params()
+            for rec_row in recommend_df.to_dict(orient="records"):
                 card_id = rec_row.get('id')
-                card_href = build_query_string(photo=str(card_id), photo_idx="0") if card_id else None
+                card_href = build_query_string(link_base, photo=str(card_id), photo_idx="0") if card_id else None
                 if not card_href and card_id:
                     card_href = f"?photo={card_id}&photo_idx=0"
                 card_href = card_href or "#top-anchor"
-                photo_url = extract_primary_photo(rec_row.get('photos')) or "https://images.unsplash.com/photo-1505691938895-1758d7feb511?auto=format&fit=crop&w=800&q=60"
+                photo_url = rec_row.get('first_photo') or extract_primary_photo(rec_row.get('photos'))
                 title_display = clean_text_field(rec_row.get('title_en') or rec_row.get('title'), 'New opportunity')
                 location_display = clean_text_field(rec_row.get('location_en') or rec_row.get('location'), 'Location pending')
-                price_display = format_price(rec_row.get('price'))
+                price_display = rec_row.get('price_display') or format_price(rec_row.get('price'))
                 location_chip = location_display.split('|')[0].strip()
                 rating_value = rec_row.get('total_rating') or rec_row.get('investment_rating')
                 try:
@@ -2875,31 +1974,18 @@ def main_dashboard():
                 is_saved = card_id in saved_ids if card_id else False
                 heart_symbol = "♥" if is_saved else "♡"
                 heart_class = "recommend-heart saved" if is_saved else "recommend-heart"
-                cards_html += compact_html(
-                    f"""
-                    <a class='recommend-card' href='{card_href}'>
-                        <div class='recommend-media'>
-                            <img src='{photo_url}' alt='{title_display}' loading='lazy'/>
-                            <span class='card-badge'>{badge_text}</span>
-                            <span class='{heart_class}'>{heart_symbol}</span>
-                        </div>
-                        <div class='recommend-body'>
-                            <div class='card-headline'>
-                                <div>
-                                    <p>{location_display}</p>
-                                    <h4>{title_display}</h4>
-                                </div>
-                                <strong class='rec-price'>{price_display}</strong>
-                            </div>
-                            <div class='card-meta-row'>
-                                {meta_html}
-                            </div>
-                        </div>
-                    </a>
-                    """
-                )
-            cards_html += "</div>"
-            st.markdown(cards_html, unsafe_allow_html=True)
+                cards_buf.append(RECOMMEND_CARD_TEMPLATE.format(
+                    card_href=card_href,
+                    photo_url=photo_url,
+                    title=title_display,
+                    location=location_display,
+                    badge_text=badge_text,
+                    heart_class=heart_class,
+                    heart_symbol=heart_symbol,
+                    price=price_display,
+                    meta_html=meta_html,
+                ))
+            st.markdown(f"<div class='recommend-cards'>{''.join(cards_buf)}</div>", unsafe_allow_html=True)
 
     st.markdown("<div class='bottom-nav'>", unsafe_allow_html=True)
     nav_items = [
@@ -3004,116 +2090,40 @@ def main_dashboard():
     else:
 
         def resolve_photo_row(target_id):
-            if target_id is None or 'id' not in df.columns:
+            if target_id is None:
                 return None
-            matches = df[df['id'] == target_id]
-            if matches is not None and not matches.empty:
-                return matches.iloc[0]
-            if username:
-                fallback = fetch_saved_properties(username)
-                if fallback is not None and not fallback.empty and 'id' in fallback.columns:
-                    matches = fallback[fallback['id'] == target_id]
-                    if not matches.empty:
-                        return matches.iloc[0]
-            return None
+            position = id_positions.get(target_id)
+            row = df.iloc[position] if position is not None else None
+            if row is None and username:
+                row = find_listing_row(fetch_saved_properties(username), target_id)
+            return row
 
         def render_photo_modal(target_row, target_id, current_idx, language):
-            photos = extract_all_photos(target_row.get('photos'))
+            ctx = listing_context(target_row, language)
+            photos = listing_photos(target_row)
             current_idx = max(0, min(current_idx, len(photos) - 1))
-            native_title = clean_text_field(target_row.get('title'), 'Property')
-            native_location = clean_text_field(target_row.get('location'), 'Location unavailable')
-            native_description = clean_text_field(target_row.get('description'), '—')
-            native_contact = clean_text_field(target_row.get('contact'), '—')
-            native_bank = clean_text_field(target_row.get('bank'), '—')
-
-            if language == "English":
-                title_display = clean_text_field(target_row.get('title_en')) or native_title
-                location_display = clean_text_field(target_row.get('location_en')) or native_location
-                description_display = clean_text_field(target_row.get('description_en')) or native_description
-                contact_display = clean_text_field(target_row.get('contact_en')) or native_contact
-                bank_display = clean_text_field(target_row.get('bank_en')) or native_bank
-                description_original = native_description if description_display != native_description else ""
-                contact_original = native_contact if contact_display != native_contact else ""
-                location_original = native_location if location_display != native_location else ""
-            else:
-                title_display = native_title
-                location_display = native_location
-                description_display = native_description
-                contact_display = native_contact
-                bank_display = native_bank
-                description_original = ""
-                contact_original = ""
-                location_original = ""
-
-            property_type_display = target_row.get('property_type') or normalize_property_type(target_row.get('property_type'), target_row.get('title')) or 'Property'
-            property_type_display = clean_text_field(property_type_display, 'Property')
-            total_photos = len(photos)
-            photo_progress = f"Photo {current_idx + 1}/{total_photos}"
-            hero_url = photos[current_idx]
-            hero_html = compact_html(
-                f"""
-                <div class='modal-shell'>
-                    <div class='modal-photo-wrapper'>
-                        <img src='{hero_url}' alt='property photo {current_idx + 1}' loading='lazy'/>
-                        <div class='modal-photo-overlay'>
-                            <div>
-                                <div class='modal-pill'>{property_type_display}</div>
-                                <h3>{title_display}</h3>
-                                <p>{location_display}</p>
-                            </div>
-                            <div class='modal-hint'>{photo_progress} · Use arrows or thumbnails</div>
-                        </div>
-                    </div>
-                </div>
-                """
-            )
-
-            price_display = format_price(target_row.get('price'))
-            size_display = first_valid_measurement([
-                ("sqm", target_row.get('size_sqm')),
-                ("sqm", target_row.get('usable_area')),
-                ("sqm", target_row.get('area_sqm'))
-            ])
-            land_display = first_valid_measurement([
-                ("sqm", target_row.get('land_size_sqm')),
-                ("sq.wah", target_row.get('land_size_sq_wah')),
-                ("rai", target_row.get('land_size_rai')),
-                ("sqm", target_row.get('land_size'))
-            ])
-            bedroom_count = format_count(target_row.get('bedrooms'))
-            room_count = format_count(target_row.get('rooms'))
-            beds_display = bedroom_count or room_count or "—"
-            if bedroom_count:
-                bed_label = l['beds']
-            elif room_count:
-                bed_label = l['rooms']
-            else:
-                bed_label = l['beds']
-            baths_display = format_count(target_row.get('bathrooms')) or format_count(target_row.get('bath_count')) or "—"
-            rent_value = target_row.get('rent_estimate')
-            try:
-                rent_display = f"{float(rent_value):,.0f} THB / mo" if rent_value else '—'
-            except (TypeError, ValueError):
-                rent_display = '—'
-            investment_rating = target_row.get('investment_rating', '—')
+            title_display = ctx['title_display']
+            location_display = ctx['location_display']
+            description_original = ctx['description_original']
+            contact_original = ctx['contact_original']
+            property_type_display = ctx['property_type_display']
+            land_display = ctx['land_display']
+            bed_label = l[ctx['bed_label_key']]
 
             stat_blocks = [
-                (l['size_label'], size_display),
+                (l['size_label'], ctx['size_display']),
             ]
             if land_display and land_display != '—':
                 stat_blocks.append((l['land_size'], land_display))
-            stat_blocks.append((bed_label, beds_display))
-            stat_blocks.append((l['baths'], baths_display))
-            stat_blocks.append(("Price", price_display))
-            stats_html = "<div class='detail-info-grid'>"
-            for label, value in stat_blocks:
-                stats_html += f"<div class='detail-stat'><span>{label}</span><strong>{value}</strong></div>"
-            stats_html += "</div>"
-
-            overview_html = f"<p>{description_display}</p>"
+            stat_blocks.append((bed_label, ctx['beds_display']))
+            stat_blocks.append((l['baths'], ctx['baths_display']))
+            stat_blocks.append(("Price", ctx['price_display']))
+            stats_html = detail_stats_html(stat_blocks)
+
+            overview_html = f"<p>{ctx['description_display']}</p>"
             if description_original:
                 overview_html += f"<div class='original-note'>Original: {description_original}</div>"
-            contact_html = f"<p>{contact_display}</p>"
+            contact_html = f"<p>{ctx['contact_display']}</p>"
             if contact_original:
                 contact_html += f"<div class='original-note'>Original: {contact_original}</div>"
 
@@ -3122,58 +2132,32 @@ def main_dashboard():
                 detail_links.append(f"<a class='cta-pill filled' href='{target_row.get('url')}' target='_blank'>Open BAM listing ↗</a>")
             detail_links_html = "".join(detail_links)
 
-            detail_body_html = compact_html(
-                f"""
-                <div class='detail-body'>
-                    <h4>Full details</h4>
-                    {overview_html}
-                    <div class='detail-duo'>
-                        <div><span>{l['contact']}:</span>{contact_html}</div>
-                        <div><span>{l['bank']}:</span><p>{bank_display}</p></div>
-                    </div>
-                    <div class='detail-duo'>
-                        <div><span>{l['rent_estimate']}:</span><p>{rent_display}</p></div>
-                        <div><span>{l['investment_rating']}:</span><p>{investment_rating}/10</p></div>
-                    </div>
-                    <div class='detail-links'>
-                        {detail_links_html}
-                    </div>
-                </div>
-                """
+            detail_body_html = DETAIL_BODY_TEMPLATE.format(
+                overview_html=overview_html,
+                contact_label=l['contact'],
+                contact_html=contact_html,
+                bank_label=l['bank'],
+                bank=ctx['bank_display'],
+                rent_label=l['rent_estimate'],
+                rent=ctx['rent_display'],
+                rating_label=l['investment_rating'],
+                rating=ctx['investment_rating'],
+                detail_links_html=detail_links_html,
             )
 
-            st.markdown("<div class='inline-photo-modal'>", unsafe_allow_html=True)
-            st.markdown(hero_html, unsafe_allow_html=True)
-            with st.container():
-                st.markdown("<div class='modal-nav-grid'>", unsafe_allow_html=True)
-                nav_cols = st.columns([1, 1, 1])
-                prev_disabled = current_idx == 0
-                next_disabled = current_idx >= total_photos - 1
-                if nav_cols[0].button("⟵ Previous", disabled=prev_disabled, key=f"modal_prev_{target_id}"):
-                    st.query_params["photo_idx"] = str(max(0, current_idx - 1))
-                    st.rerun()
-                nav_cols[1].markdown(f"<div class='nav-chip modal-chip'>{photo_progress}</div>", unsafe_allow_html=True)
-                if nav_cols[2].button("Next ⟶", disabled=next_disabled, key=f"modal_next_{target_id}"):
-                    st.query_params["photo_idx"] = str(min(total_photos - 1, current_idx + 1))
-                    st.rerun()
-                st.markdown("</div>", unsafe_allow_html=True)
-
-            thumbs_html = "<div class='modal-thumb-grid'>"
-            for idx, url in enumerate(photos[:12]):
-                thumb_href = build_query_string(photo=str(target_id), photo_idx=str(idx)) or f"?photo={target_id}&photo_idx={idx}"
-                active_class = "active" if idx == current_idx else ""
-                thumbs_html += f"<a class='{active_class}' href='{thumb_href}' target='_self'><img src='{url}' alt='thumbnail {idx + 1}'/></a>"
-            thumbs_html += "</div>"
-            st.markdown(thumbs_html, unsafe_allow_html=True)
-            st.markdown(stats_html, unsafe_allow_html=True)
-            st.markdown(detail_body_html, unsafe_allow_html=True)
+            close_href = build_query_string(photo=None, photo_idx=None) or "?"
+            close_html = f"<div class='modal-close-row'><a href='{close_href}' target='_self'>Close viewer</a></div>"
 
-            st.markdown("<div class='modal-close-row'>", unsafe_allow_html=True)
-            if st.button("Close viewer", key=f"modal_close_{target_id}"):
-                clear_query_keys("photo", "photo_idx")
-                st.rerun()
-            st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            modal_slot = st.empty()
+            with modal_slot.container():
+                components.html(
+                    photo_carousel_html(photos, current_idx, property_type_display, title_display, location_display),
+                    height=PHOTO_CAROUSEL_HEIGHT,
+                )
+                st.markdown(
+                    f"<div class='inline-photo-modal'>{stats_html}{detail_body_html}{close_html}</div>",
+                    unsafe_allow_html=True,
+                )
 
         def render_pagination_controls(page_key, current_page, total_pages, position="top"):
             if total_pages <= 1:
@@ -3181,26 +2165,43 @@ def main_dashboard():
 
             def jump_to(target_page):
                 st.session_state[page_key] = target_page
-                st.rerun()
+                st.query_params[page_key] = str(target_page)
 
-            sequence = build_pagination_sequence(current_page, total_pages)
+            # One keyed widget for the page numbers, so a click reruns this session instead of reloading the page.
+            pager_key = f"{page_key}_{position}_pages"
+
+            def jump_to_selected():
+                selected = st.session_state.get(pager_key)
+                if selected is not None and selected > 0:
+                    jump_to(selected)
+
+            st.session_state[pager_key] = current_page
             prev_col, pages_col, next_col = st.columns([1, 4, 1])
             with prev_col:
-                if st.button("← Prev", key=f"{page_key}_{position}_prev", disabled=current_page <= 1):
-                    jump_to(current_page - 1)
+                st.button(
+                    "← Prev",
+                    key=f"{page_key}_{position}_prev",
+                    disabled=current_page <= 1,
+                    on_click=jump_to,
+                    args=(current_page - 1,),
+                )
             with pages_col:
-                page_cols = st.columns(len(sequence))
-                for idx, label in enumerate(sequence):
-                    with page_cols[idx]:
-                        if label == '...':
-                            st.markdown("<div style='text-align:center;padding:10px 0;color:var(--text-muted, #94a3b8);'>...</div>", unsafe_allow_html=True)
-                        else:
-                            is_active = label == current_page
-                            if st.button(str(label), key=f"{page_key}_{position}_btn_{label}", disabled=is_active):
-                                jump_to(label)
+                st.segmented_control(
+                    "Page",
+                    pagination_options(current_page, total_pages),
+                    format_func=pagination_label,
+                    key=pager_key,
+                    on_change=jump_to_selected,
+                    label_visibility="collapsed",
+                )
             with next_col:
-                if st.button("Next →", key=f"{page_key}_{position}_next", disabled=current_page >= total_pages):
-                    jump_to(current_page + 1)
+                st.button(
+                    "Next →",
+                    key=f"{page_key}_{position}_next",
+                    disabled=current_page >= total_pages,
+                    on_click=jump_to,
+                    args=(current_page + 1,),
+                )
 
         def render_detail_page(target_row, language):
             property_id = target_row.get('id') or target_row.get('property_id')
@@ -3209,88 +2210,45 @@ def main_dashboard():
             except (TypeError, ValueError):
                 property_id = None
 
-            photos = extract_all_photos(target_row.get('photos'))
+            ctx = listing_context(target_row, language)
+            photos = listing_photos(target_row)
             primary_photo = photos[0] if photos else DEFAULT_PLACEHOLDER_IMAGE
 
-            native_title = clean_text_field(target_row.get('title'), 'Property')
-            native_location = clean_text_field(target_row.get('location'), 'Location unavailable')
-            native_description = clean_text_field(target_row.get('description'), '—')
-            native_contact = clean_text_field(target_row.get('contact'), '—')
-            native_bank = clean_text_field(target_row.get('bank'), '—')
-
-            if language == "English":
-                title_display = clean_text_field(target_row.get('title_en')) or native_title
-                location_display = clean_text_field(target_row.get('location_en')) or native_location
-                description_display = clean_text_field(target_row.get('description_en')) or native_description
-                contact_display = clean_text_field(target_row.get('contact_en')) or native_contact
-                bank_display = clean_text_field(target_row.get('bank_en')) or native_bank
-                description_original = native_description if description_display != native_description else ""
-                contact_original = native_contact if contact_display != native_contact else ""
-            else:
-                title_display = native_title
-                location_display = native_location
-                description_display = native_description
-                contact_display = native_contact
-                bank_display = native_bank
-                description_original = ""
-                contact_original = ""
-
-            property_type_display = target_row.get('property_type') or normalize_property_type(target_row.get('property_type'), target_row.get('title')) or 'Property'
-            property_type_display = clean_text_field(property_type_display, 'Property')
-            price_display = format_price(target_row.get('price'))
-            bedroom_count = format_count(target_row.get('bedrooms'))
-            room_count = format_count(target_row.get('rooms'))
-            beds_display = bedroom_count or room_count or "—"
-            bed_label = l['beds'] if bedroom_count or not room_count else l['rooms']
-            if not bedroom_count and room_count:
-                bed_label = l['rooms']
-            baths_display = format_count(target_row.get('bathrooms')) or format_count(target_row.get('bath_count')) or "—"
-            size_display = first_valid_measurement([
-                ("sqm", target_row.get('size_sqm')),
-                ("sqm", target_row.get('usable_area')),
-                ("sqm", target_row.get('area_sqm'))
-            ])
-            land_display = first_valid_measurement([
-                ("sqm", target_row.get('land_size_sqm')),
-                ("sq.wah", target_row.get('land_size_sq_wah')),
-                ("rai", target_row.get('land_size_rai')),
-                ("sqm", target_row.get('land_size'))
-            ])
-            rent_value = target_row.get('rent_estimate')
-            try:
-                rent_display = f"{float(rent_value):,.0f} THB / mo" if rent_value else '—'
-            except (TypeError, ValueError):
-                rent_display = '—'
-            investment_rating = target_row.get('investment_rating', '—')
+            title_display = ctx['title_display']
+            location_display = ctx['location_display']
+            bank_display = ctx['bank_display']
+            description_original = ctx['description_original']
+            contact_original = ctx['contact_original']
+            location_original = ctx['location_original']
+            property_type_display = ctx['property_type_display']
+            rent_display = ctx['rent_display']
+            investment_rating = ctx['investment_rating']
 
             sale_channel_value = (target_row.get('sale_channel') or 'standard').lower()
             sale_label = display_sale_channel(sale_channel_value)
-            bank_line = f" · {bank_display}" if bank_display and bank_display not in ('—', 'N/A', 'n/a') else ""
+            bank_line = "" if is_missing_text(bank_display) else f" · {bank_display}"
 
             quick_view_href = None
             if property_id is not None:
                 quick_view_href = build_query_string(photo=str(property_id), photo_idx='0') or f"?photo={property_id}"
 
             stat_blocks = [
-                (l['price'], price_display),
-                (l['size_label'], size_display),
-                (l['land_size'], land_display),
-                (bed_label, beds_display),
-                (l['baths'], baths_display),
+                (l['price'], ctx['price_display']),
+                (l['size_label'], ctx['size_display']),
+                (l['land_size'], ctx['land_display']),
+                (l[ctx['bed_label_key']], ctx['beds_display']),
+                (l['baths'], ctx['baths_display']),
                 (l['rent_estimate'], rent_display),
                 (l['investment_rating'], f"{investment_rating}/10" if investment_rating not in (None, '—') else '—')
             ]
 
-            stats_html = "<div class='detail-info-grid'>"
-            for label, value in stat_blocks:
-                stats_html += f"<div class='detail-stat'><span>{label}</span><strong>{value}</strong></div>"
-            stats_html += "</div>"
+            stats_html = detail_stats_html(stat_blocks)
 
-            description_html = f"<p>{description_display}</p>"
+            description_html = f"<p>{ctx['description_display']}</p>"
             if description_original:
                 description_html += f"<div class='original-note'>Original: {description_original}</div>"
 
-            contact_html = f"<p>{contact_display}</p>"
+            contact_html = f"<p>{ctx['contact_display']}</p>"
             if contact_original:
                 contact_html += f"<div class='original-note'>Original: {contact_original}</div>"
 
@@ -3298,30 +2256,19 @@ def main_dashboard():
             if quick_view_href:
                 hero_cta_html = f"<a class='cta-pill filled' href='{quick_view_href}' target='_self'>Quick photo viewer ↗</a>"
 
-            detail_html = compact_html(
-                f"""
-                <div class='detail-page-shell'>
-                    <div class='detail-hero'>
-                        <img src='{primary_photo}' alt='detail hero' loading='lazy'/>
-                        <div class='detail-hero-overlay'>
-                            <div>
-                                <div class='modal-pill'>{property_type_display}</div>
-                                <h2>{title_display}</h2>
-                                <p>{location_display}</p>
-                                <div class='sale-pill'>{sale_label}{bank_line}</div>
-                            </div>
-                            <div class='detail-hero-actions'>
-                                {hero_cta_html}
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                """
+            detail_html = DETAIL_HERO_TEMPLATE.format(
+                photo_url=primary_photo,
+                property_type=property_type_display,
+                title=title_display,
+                location=location_display,
+                sale_label=sale_label,
+                bank_line=bank_line,
+                hero_cta_html=hero_cta_html,
             )
 
             st.markdown(detail_html, unsafe_allow_html=True)
 
-            map_links = build_map_links(target_row.get('lat'), target_row.get('lon'), native_location)
+            map_links = build_map_links(target_row.get('lat'), target_row.get('lon'), ctx['native_location'])
             direction_actions = ""
             if map_links:
                 action_buttons = []
@@ -3334,27 +2281,14 @@ def main_dashboard():
                         f"<a class='map-icon apple' href='{map_links['apple']}' target='_blank' rel='noopener noreferrer'><span>A</span></a>"
                     )
                 if action_buttons:
-                    direction_actions = compact_html(
-                        f"""
-                        <div class='map-action-row'>
-                            <span class='map-action-label'>Directions</span>
-                            {''.join(action_buttons)}
-                        </div>
-                        """
-                    )
+                    direction_actions = MAP_ACTION_ROW_TEMPLATE.format(action_buttons=''.join(action_buttons))
             if not direction_actions:
                 direction_actions = "<div class='map-action-row'><span class='map-action-label'>Directions unavailable</span></div>"
 
-            location_card_html = compact_html(
-                f"""
-                <div class='detail-location-card'>
-                    <div class='location-line'>
-                        <span class='location-pill'>{location_display}</span>
-                        {f"<div class='original-note'>Original: {location_original}</div>" if location_original else ''}
-                    </div>
-                    {direction_actions}
-                </div>
-                """
+            location_card_html = LOCATION_CARD_TEMPLATE.format(
+                location=location_display,
+                original_note=f"<div class='original-note'>Original: {location_original}</div>" if location_original else '',
+                direction_actions=direction_actions,
             )
 
             st.subheader("Location & Directions")
@@ -3373,13 +2307,12 @@ def main_dashboard():
 
             if photos:
                 st.subheader("Photo thumbnails")
-                thumb_html = "<div class='modal-thumb-grid'>"
+                thumb_base = build_query_string(photo=str(property_id), photo_idx=None) if property_id is not None else None
+                thumb_links = []
                 for idx, url in enumerate(photos[:18]):
-                    thumb_href = build_query_string(photo=str(property_id), photo_idx=str(idx)) if property_id is not None else None
-                    link_attr = f"href='{thumb_href}' target='_self'" if thumb_href else ""
-                    thumb_html += f"<a {link_attr}><img src='{url}' alt='thumbnail {idx + 1}'/></a>"
-                thumb_html += "</div>"
-                st.markdown(thumb_html, unsafe_allow_html=True)
+                    link_attr = f"href='{thumb_base}&photo_idx={idx}' target='_self'" if thumb_base else ""
+                    thumb_links.append(f"<a {link_attr}><img src='{url}' alt='thumbnail {idx + 1}'/></a>")
+                st.markdown(f"<div class='modal-thumb-grid'>{''.join(thumb_links)}</div>", unsafe_allow_html=True)
 
             if st.button("← Back to listings", key="detail_back_button"):
                 clear_query_keys('detail')
@@ -3426,10 +2359,7 @@ def main_dashboard():
             unsafe_allow_html=True,
         )
 
-        sale_display_map = {opt: display_sale_channel(opt) for opt in sale_options}
-        sale_label_groups = {}
-        for opt, label in sale_display_map.items():
-            sale_label_groups.setdefault(label, set()).add(opt)
+        sale_display_map, sale_label_groups = sale_channel_maps(tuple(sale_options))
 
         sale_filter_label = "All"
         property_type_choice = "All"
@@ -3500,8 +2430,8 @@ def main_dashboard():
         if view_mode == 'all':
             mask = pd.Series(True, index=df.index)
             if 'price' in df.columns:
-                mask &= df['price'].fillna(0) >= price_min
-                mask &= df['price'].fillna(0) <= price_max
+                price_values = df['price'].fillna(0).to_numpy()
+                mask &= (price_values >= price_min) & (price_values <= price_max)
 
             if property_options and property_type_choice != "All":
                 mask &= df['property_type'] == property_type_choice
@@ -3512,14 +2442,7 @@ def main_dashboard():
                     mask &= df['sale_channel'].isin(list(sale_keys))
 
             if keyword:
-                keyword_lower = keyword.lower()
-                mask &= df.apply(
-                    lambda row: any(
-                        keyword_lower in str(row.get(field, '')).lower()
-                        for field in ['title', 'location', 'description', 'bank', 'contact']
-                    ),
-                    axis=1,
-                )
+                mask &= keyword_mask(search_text, keyword)
 
             filtered_df = df[mask]
         else:
@@ -3529,16 +2452,13 @@ def main_dashboard():
             saved_df = df[df['id'].isin(saved_ids)]
         elif saved_ids:
             saved_df = fetch_saved_properties(username)
+            if not saved_df.empty:
+                saved_df['property_type'] = normalize_property_types(saved_df)
         else:
             saved_df = pd.DataFrame()
 
-        if not saved_df.empty:
-            saved_df = saved_df.copy()
-            saved_df['property_type'] = saved_df.apply(lambda row: normalize_property_type(row.get('property_type'), row.get('title')), axis=1)
-
         def render_property_cards(display_df, context_key, empty_message):
-            local_df = display_df.reset_index(drop=True)
-            if local_df.empty:
+            if display_df.empty:
                 st.info(empty_message)
                 return
 
@@ -3551,190 +2471,29 @@ def main_dashboard():
                     return ("Market price", "fair")
                 return ("Premium priced", "bad")
 
-            st.markdown("<div class='property-grid-wrapper'>", unsafe_allow_html=True)
-            for block_start in range(0, len(local_df), 3):
-                st.markdown("<div class='property-grid-row'>", unsafe_allow_html=True)
-                card_cols = st.columns(3, gap="large")
-                for offset in range(3):
-                    idx = block_start + offset
-                    if idx >= len(local_df):
-                        break
-                    row = local_df.iloc[idx]
-                    with card_cols[offset]:
-                        property_id = row.get('id') or row.get('property_id')
-                        try:
-                            property_id = int(property_id)
-                        except (TypeError, ValueError):
-                            property_id = None
-
-                        native_title = clean_text_field(row.get('title'), 'N/A') or 'N/A'
-                        native_location = clean_text_field(row.get('location'), 'N/A') or 'N/A'
-                        native_bank = clean_text_field(row.get('bank'), 'N/A') or 'N/A'
-                        native_contact = clean_text_field(row.get('contact'), 'N/A') or 'N/A'
-
-                        if lang == "English":
-                            title_t = clean_text_field(row.get('title_en')) or translate_text(native_title, "en")
-                            location_t = clean_text_field(row.get('location_en')) or translate_text(native_location, "en")
-                            bank_t = clean_text_field(row.get('bank_en')) or translate_text(native_bank, "en")
-                            contact_t = clean_text_field(row.get('contact_en')) or translate_text(native_contact, "en")
-                        else:
-                            title_t = native_title
-                            location_t = native_location
-                            bank_t = native_bank
-                            contact_t = native_contact
-                        if not location_t:
-                            location_t = native_location
-
-                        photos = extract_all_photos(row.get('photos'))
-                        first_photo = next(
-                            (url for url in photos if looks_like_property_photo(url)),
-                            photos[0] if photos else DEFAULT_PLACEHOLDER_IMAGE,
-                        )
-                        property_type_display = row.get('property_type') or normalize_property_type(row.get('property_type'), row.get('title')) or 'Property'
-                        property_type_display = clean_text_field(property_type_display, 'Property')
-                        photo_count = len(photos)
-                        photo_count_label = f"{photo_count} photo{'s' if photo_count != 1 else ''}"
-                        photo_href = "#"
-                        if property_id is not None:
-                            photo_href = build_query_string(photo=str(property_id), photo_idx='0') or f"?photo={property_id}"
-
-                        raw_price = row.get('price')
-                        try:
-                            price_value_num = float(raw_price) if raw_price else None
-                        except (TypeError, ValueError):
-                            price_value_num = None
-                        price_display = format_price(raw_price)
-                        rent_value = row.get('rent_estimate')
-                        try:
-                            rent_display = f"{float(rent_value):,.0f} THB / mo" if rent_value else '—'
-                        except (TypeError, ValueError):
-                            rent_display = '—'
-                        living_rating = row.get('living_rating', '—')
-                        investment_rating = row.get('investment_rating')
-                        try:
-                            investment_display = f"{float(investment_rating):.1f}/10" if investment_rating not in (None, '—', '') else '—'
-                        except (TypeError, ValueError):
-                            investment_display = '—'
-
-                        size_display = first_valid_measurement([
-                            ("sqm", row.get('size_sqm')),
-                            ("sqm", row.get('usable_area')),
-                            ("sqm", row.get('area_sqm'))
-                        ])
-                        land_display = first_valid_measurement([
-                            ("sqm", row.get('land_size_sqm')),
-                            ("sq.wah", row.get('land_size_sq_wah')),
-                            ("rai", row.get('land_size_rai')),
-                            ("sqm", row.get('land_size')),
-                            ("sqm", row.get('land_area'))
-                        ])
-                        bedroom_count = format_count(row.get('bedrooms'))
-                        room_count = format_count(row.get('rooms'))
-                        beds_value = bedroom_count or room_count or "—"
-                        if bedroom_count:
-                            bed_meta_label = l['beds']
-                        elif room_count:
-                            bed_meta_label = l['rooms']
-                        else:
-                            bed_meta_label = l['beds']
-                        bath_count_display = format_count(row.get('bathrooms')) or format_count(row.get('bath_count')) or "—"
-
-                        sale_channel_value = (row.get('sale_channel') or 'standard').lower()
-                        sale_label = display_sale_channel(sale_channel_value)
-                        bank_display = ''
-                        if sale_label.lower().startswith('foreclosure') and bank_t and bank_t.lower() not in ('n/a', 'na', '-'):
-                            bank_display = f" · {bank_t}"
-                        sale_html = f"<div class='sale-pill'>{sale_label}{bank_display}</div>"
-
-                        detail_href = "#"
-                        if property_id is not None:
-                            detail_href = build_query_string(
-                                detail=str(property_id),
-                                photo=None,
-                                photo_idx=None
-                            ) or f"?detail={property_id}"
-
-                        if not username:
-                            save_html = "<span class='icon-btn heart disabled' title='Login to save'></span>"
-                        elif property_id is not None:
-                            is_saved = property_id in saved_ids
-                            save_link = build_query_string(
-                                photo=None,
-                                photo_idx=None,
-                                save=str(property_id),
-                                save_op='remove' if is_saved else 'add'
-                            ) or f"?save={property_id}&save_op={'remove' if is_saved else 'add'}"
-                            heart_class = "icon-btn heart saved" if is_saved else "icon-btn heart"
-                            save_html = f"<a class='{heart_class}' href='{save_link}' onclick='event.stopPropagation();' aria-label='Save listing'></a>"
-                        else:
-                            save_html = ""
-
-                        share_html = f"<a class='icon-btn share' href='{detail_href}' onclick=\"event.stopPropagation();\" aria-label='Share listing'></a>" if property_id is not None else ""
-
-                        photo_html = compact_html(
-                            f"""
-                            <a class='card-photo' href='{photo_href}' onclick="event.stopPropagation();" target='_self'>
-                                <img src='{first_photo}' alt='Photo of {title_t}' loading='lazy'/>
-                                <div class='photo-top-row'>
-                                    <span class='photo-pill'>{property_type_display}</span>
-                                    <div class='photo-actions'>
-                                        {save_html}
-                                        {share_html}
-                                    </div>
-                                </div>
-                                <div class='photo-bottom-row'>
-                                    <span class='photo-pill'>{photo_count_label}</span>
-                                    <div class='photo-actions'>
-                                        {sale_html}
-                                    </div>
-                                </div>
-                            </a>
-                            """
-                        )
-
-                        agent_name = contact_t if contact_t and contact_t.lower() not in ("n/a", "na", "-", "—") else "Agent contact pending"
-                        agent_meta = bank_t if bank_t and bank_t.lower() not in ("n/a", "na", "-", "—") else sale_label
-                        agent_html = compact_html(
-                            f"""
-                            <div class='agent-chip'>
-                                <div class='agent-avatar'>👤</div>
-                                <div>
-                                    <strong>{agent_name}</strong>
-                                    <span>{agent_meta}</span>
-                                </div>
-                            </div>
-                            """
-                        )
-
-                        price_block_html = compact_html(
-                            f"""
-                            <div class='price-cta-row'>
-                                <div class='price-stack'>
-                                    <span>{l['price']}</span>
-                                    <strong>{price_display}</strong>
-                                </div>
-                                <a class='buy-pill' href='{detail_href}' onclick="event.stopPropagation();">Buy Now</a>
-                            </div>
-                            """
-                        )
+            base_params = get_query_params()
+            base_params.pop('photo', None)
+            base_params.pop('photo_idx', None)
 
-                        card_html = compact_html(
-                            f"""
-                            <div class="property-card">
-                                {photo_html}
-                                <div class="card-body" role="link" tabindex="0" onclick="window.location='{detail_href}'" onkeypress="if(event.key==='Enter' || event.key===' '){{window.location='{detail_href}'}}">
-                                    <h4>{title_t}</h4>
-                                    <p class='card-location'>📍 {location_t}</p>
-                                    {specs_html}
-                                    {agent_html}
-                                    {price_block_html}
-                                </div>
-                            </div>
-                            """
-                        )
-                        st.markdown(card_html, unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            card_labels = (l['beds'], l['rooms'], l['baths'], l['price'])
+            link_params = tuple(base_params.items())
+            cards_buf = []
+            for row in display_df.to_dict(orient="records"):
+                property_id = row.get('id') or row.get('property_id')
+                try:
+                    property_id = int(property_id)
+                except (TypeError, ValueError):
+                    property_id = None
+                cards_buf.append(render_listing_card(
+                    property_id,
+                    row,
+                    listing_card_texts(row, lang, translate_text),
+                    card_labels,
+                    link_params,
+                    property_id in saved_ids,
+                    bool(username),
+                ))
+            st.markdown(f"<div class='property-grid'>{''.join(cards_buf)}</div>", unsafe_allow_html=True)
 
         target_df = saved_df if view_mode == 'saved' else filtered_df
         if view_mode == 'saved' and not username:
@@ -3744,18 +2503,19 @@ def main_dashboard():
         total_items = len(target_df)
         total_pages = max(1, (total_items + page_size - 1) // page_size)
         page_key = f"page_{view_mode}"
-        if page_key not in st.session_state or st.session_state[page_key] < 1:
-            st.session_state[page_key] = 1
-        current_page = st.session_state[page_key]
-        if current_page > total_pages:
-            current_page = total_pages
-            st.session_state[page_key] = current_page
+        try:
+            requested_page = int(params.get(page_key, 0))
+        except (TypeError, ValueError):
+            requested_page = 0
+        current_page = requested_page if requested_page >= 1 else st.session_state.get(page_key, 1)
+        current_page = min(max(current_page, 1), total_pages)
+        st.session_state[page_key] = current_page
 
         render_pagination_controls(page_key, current_page, total_pages, position="top")
 
         start_idx = (current_page - 1) * page_size
         end_idx = start_idx + page_size
-        page_df = target_df.iloc[start_idx:end_idx]
+        page_df = target_df.iloc[start_idx:end_idx][[col for col in CARD_COLUMNS if col in target_df.columns]]
 
         view_label = "Saved" if view_mode == 'saved' else l['listings_found']
         st.subheader(f"{view_label}: {total_items} ({l['page']} {current_page}/{total_pages}) · {page_size} cards/page")
@@ -3775,91 +2535,15 @@ def main_dashboard():
             st.markdown("<div id='map-section'></div>", unsafe_allow_html=True)
             st.subheader("📍 Map Overview")
             if not filtered_df.empty and {'lat', 'lon'}.issubset(filtered_df.columns):
-                map_columns = ['lat', 'lon', 'title', 'title_en', 'price', 'location', 'location_en', 'photos']
-                map_subset = [col for col in map_columns if col in filtered_df.columns]
-                map_df = filtered_df[map_subset].dropna(subset=['lat', 'lon']).copy()
-                if not map_df.empty:
-                    map_df = map_df.head(500)
-                    map_df['lat'] = map_df['lat'].astype(float)
-                    map_df['lon'] = map_df['lon'].astype(float)
-
-                    map_df['display_title'] = map_df.apply(
-                        lambda row: clean_text_field(row.get('title_en')) or clean_text_field(row.get('title')) or "Untitled asset",
-                        axis=1
-                    )
-                    map_df['location_display'] = map_df.apply(
-                        lambda row: clean_text_field(row.get('location_en')) or clean_text_field(row.get('location')) or "Location pending",
-                        axis=1
-                    )
-                    if 'price' in map_df.columns:
-                        map_df['price_display'] = map_df['price'].apply(
-                            lambda value: format_price(value) if pd.notnull(value) else "Price on request"
-                        )
-                    else:
-                        map_df['price_display'] = "Price on request"
-
-                    def resolve_preview_photo(raw_value):
-                        if raw_value is None:
-                            return DEFAULT_PLACEHOLDER_IMAGE
-                        if isinstance(raw_value, float) and math.isnan(raw_value):
-                            return DEFAULT_PLACEHOLDER_IMAGE
-                        return extract_primary_photo(raw_value)
-
-                    if 'photos' in map_df.columns:
-                        map_df['preview_photo'] = map_df['photos'].apply(resolve_preview_photo)
-                    else:
-                        map_df['preview_photo'] = DEFAULT_PLACEHOLDER_IMAGE
-
-                    zoom_hint = 12 if len(map_df) < 20 else 10 if len(map_df) < 60 else 9
-                    def normalize_value(value):
-                        if isinstance(value, (str, int, float)) or value is None:
-                            return value
-                        if hasattr(value, "item"):
-                            try:
-                                return value.item()
-                            except Exception:
-                                return str(value)
-                        if isinstance(value, (datetime, pd.Timestamp)):
-                            return value.isoformat()
-                        return str(value)
-
-                    map_records = []
-                    for record in map_df.to_dict(orient="records"):
-                        map_records.append({key: normalize_value(val) for key, val in record.items()})
-                    tooltip = {
-                        "html": (
-                            "<div style='width:220px'>"
-                            "<strong>{display_title}</strong><br/>"
-                            "{price_display}<br/>"
-                            "<span style='color:#6b7280'>{location_display}</span><br/>"
-                            "<img src='{preview_photo}' style='width:100%;margin-top:6px;border-radius:8px;'/>"
-                            "</div>"
-                        ),
-                        "style": {"backgroundColor": "#ffffff", "color": "#111827", "fontSize": "12px"},
-                    }
-                    deck_spec = {
-                        "mapStyle": "mapbox://styles/mapbox/dark-v11",
-                        "initialViewState": {
-                            "latitude": float(map_df['lat'].mean()),
-                            "longitude": float(map_df['lon'].mean()),
-                            "zoom": zoom_hint,
-                            "pitch": 0,
-                        },
-                        "layers": [
-                            {
-                                "@@type": "ScatterplotLayer",
-                                "data": map_records,
-                                "getPosition": "[lon, lat]",
-                                "getRadius": 350,
-                                "getFillColor": [239, 68, 68, 180],
-                                "getLineColor": [248, 250, 252],
-                                "lineWidthMinPixels": 1,
-                                "pickable": True,
-                            }
-                        ],
-                        "tooltip": tooltip,
-                    }
-                    st.pydeck_chart(JsonDeckSpec(deck_spec), width="stretch")
+                # Every column build_map_deck reads, so refreshed locations or photos rebuild the tooltips.
+                hash_columns = [col for col in MAP_COLUMNS if col in filtered_df.columns]
+                map_hash = int(pd.util.hash_pandas_object(filtered_df[hash_columns]).sum())
+                if st.session_state.get('map_deck_hash') != map_hash:
+                    st.session_state['map_deck'] = build_map_deck(filtered_df)
+                    st.session_state['map_deck_hash'] = map_hash
+                map_deck = st.session_state['map_deck']
+                if map_deck is not None:
+                    st.pydeck_chart(map_deck, width="stretch")
                 else:
                     st.caption("No coordinates available yet.")
             else:
@@ -3876,33 +2560,15 @@ def main_dashboard():
         for col, item in zip(nav_cols, nav_items):
             with col:
                 is_active = st.session_state.get('bottom_nav_active', 'Home') == item['label']
-                btn_type = "primary" if is_active else "secondary"
-                clicked = st.button(
+                # app_nav_ keys: the header nav row already owns bottom_nav_<label>.
+                st.button(
                     f"{item['icon']} {item['label']}",
-                    key=f"bottom_nav_{item['label']}",
+                    key=f"app_nav_{item['label']}",
                     use_container_width=True,
-                    type=btn_type,
+                    type="primary" if is_active else "secondary",
+                    on_click=select_app_nav,
+                    args=(item['label'],),
                 )
-                if clicked:
-                    st.session_state['bottom_nav_active'] = item['label']
-                    if item['label'] == 'Home':
-                        st.session_state['view_mode'] = 'all'
-                        view_mode = 'all'
-                        st.session_state['focus_section'] = 'top'
-                        st.session_state['account_panel_open'] = False
-                    elif item['label'] == 'Explore':
-                        st.session_state['view_mode'] = 'all'
-                        view_mode = 'all'
-                        st.session_state['focus_section'] = 'map'
-                        st.session_state['account_panel_open'] = False
-                    elif item['label'] == 'Wishlist':
-                        st.session_state['view_mode'] = 'saved'
-                        view_mode = 'saved'
-                        st.session_state['focus_section'] = 'top'
-                        st.session_state['account_panel_open'] = False
-                    elif item['label'] == 'Account':
-                        st.session_state['account_panel_open'] = True
-                        st.session_state['focus_section'] = 'account'
         st.markdown("</div></div>", unsafe_allow_html=True)
 
         focus_target = st.session_state.get('focus_section')
@@ -3913,14 +2579,14 @@ def main_dashboard():
                 'account': 'account-section',
             }.get(focus_target)
             if target_id:
-                st.markdown(
+                components.html(
                     f"""
                     <script>
-                        const anchor = document.getElementById('{target_id}');
+                        const anchor = window.parent.document.getElementById('{target_id}');
                         if (anchor) {{ anchor.scrollIntoView({{behavior: 'smooth'}}); }}
                     </script>
                     """,
-                    unsafe_allow_html=True,
+                    height=0,
                 )
             st.session_state['focus_section'] = None
 